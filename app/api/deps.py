@@ -15,7 +15,7 @@ from app.core.security import (
     verify_access_token,
     verify_scoped_token,
 )
-from app.db import get_db_session
+from app.db import get_db_session, get_readonly_db_session
 from app.i18n.codes import ErrorCode
 from app.models.user import UserProfile
 
@@ -34,6 +34,16 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_readonly_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints (autoflush disabled, never committed).
+
+    Endpoints that already depend on get_current_user (or anything else built on get_db)
+    should keep using get_db so the request shares one session instead of two connections.
+    """
+    async for session in get_readonly_db_session():
+        yield session
+
+
 async def _resolve_user(db: AsyncSession, token: str) -> CurrentUser:
     """Verify JWT and ensure local profile exists."""
     auth_user = await verify_access_token(token)
@@ -5,7 +5,7 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import CurrentUser, get_current_user, get_db
+from app.api.deps import CurrentUser, get_current_user, get_readonly_db
 from app.core.exceptions import BusinessError
 from app.core.redis import get_redis_client
 from app.core.response import success
@@ -49,7 +49,7 @@ async def _check_celery() -> bool:
 
 
 @router.get("/readiness")
-async def readiness(db: AsyncSession = Depends(get_db)) -> JSONResponse:
+async def readiness(db: AsyncSession = Depends(get_readonly_db)) -> JSONResponse:
     """Readiness:Postgres/Redis/Celery 任一不可达即 503(带 per-dep 明细)。
 
     部署门指向此端点才是真 smoke test;/health 仅作 liveness。不复用 HealthChecker
@@ -38,6 +38,8 @@ class Settings(BaseSettings):
     # 单 API worker 共享此一池，适度调大以容纳一次页面的并发齐射。
     DB_POOL_SIZE: int = Field(default=10)
     DB_MAX_OVERFLOW: int = Field(default=20)
+    # 连接存活上限（秒），超过后在下次 checkout 时重建，避免被 PG/中间代理静默断开的连接卡住请求
+    DB_POOL_RECYCLE: int = Field(default=1800)
 
     # Auth Service (统一认证)
     AUTH_SERVICE_URL: str = Field(default="http://localhost:8100")
@@ -53,6 +55,8 @@ class Settings(BaseSettings):
     CONFIG_CENTER_DB_ENABLED: bool = Field(default=True)
     CONFIG_CENTER_CACHE_TTL: int = Field(default=60)
     DEAD_TASK_SWEEP_ENABLED: bool = Field(default=True)
+    # @monitor 进程内调用指标；关闭后装饰器在装饰时直接返回原函数，调用路径零开销
+    MONITORING_ENABLED: bool = Field(default=True)
     # 用户默认免费 ASR 额度（秒），1小时 = 3600秒
     DEFAULT_USER_FREE_QUOTA_SECONDS: int = Field(default=3600)
 
@@ -21,7 +21,9 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
+from collections.abc import Mapping
 from threading import Lock
+from types import MappingProxyType
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, ValidationError
@@ -108,6 +110,10 @@ class ConfigManager:
         "feature": {},
     }
 
+    # 读路径快表：{(service_type, name): config_instance}，与 _configs 同步写入，
+    # get_config 命中时一次哈希查找即可返回
+    _configs_flat: dict[tuple[str, str], ServiceConfig] = {}
+
     _config_timestamps: dict[str, dict[str, float]] = {
         "llm": {},
         "asr": {},
@@ -129,6 +135,14 @@ class ConfigManager:
         "feature": {},
     }
 
+    # 负缓存：探测过且未注册的 (service_type, name)，register_schema 时移除；
+    # 超过上限整体清空，避免调用方传入任意名称导致无界增长
+    _missing_schemas: set[tuple[str, str]] = set()
+    _MISSING_SCHEMAS_MAX = 128
+
+    # 已通过 issubclass 校验的配置类，重复注册（热重载/测试）时跳过 MRO 遍历
+    _validated_classes: set[type] = set()
+
     _db_session_factory: async_sessionmaker[AsyncSession] | None = None
     _cache_ttl_seconds: int = 0
 
@@ -137,7 +151,7 @@ class ConfigManager:
 
     # 配置字段映射表：{service_type: {name: {field: settings_attr}}}
     # 数据驱动配置加载，避免 if-elif 分支（P2-1 优化）
-    _CONFIG_MAPPING: dict[str, dict[str, dict[str, str]]] = {
+    _CONFIG_MAPPING: Mapping[str, Mapping[str, Mapping[str, str]]] = {
         "llm": {
             "image_service": {
                 "base_url": "IMAGE_SERVICE_BASE_URL",
@@ -213,6 +227,13 @@ class ConfigManager:
         # feature 开关无 settings 字段映射，空表使查表命中不打 WARNING
         "feature": {},
     }
+    # 映射表只读：逐层冻结为 MappingProxyType，防止运行时被误改
+    _CONFIG_MAPPING = MappingProxyType(
+        {
+            service_type: MappingProxyType({name: MappingProxyType(fields) for name, fields in providers.items()})
+            for service_type, providers in _CONFIG_MAPPING.items()
+        }
+    )
 
     @classmethod
     def register_schema(
@@ -241,12 +262,21 @@ class ConfigManager:
         if service_type not in cls._schemas:
             raise ValueError(f"Unsupported service_type: {service_type}. Supported types: {list(cls._schemas.keys())}")
 
-        if not issubclass(config_class, ServiceConfig):
-            raise ValueError(f"config_class must be a subclass of ServiceConfig, got {config_class}")
+        if config_class not in cls._validated_classes:
+            if not issubclass(config_class, ServiceConfig):
+                raise ValueError(f"config_class must be a subclass of ServiceConfig, got {config_class}")
+            cls._validated_classes.add(config_class)
 
+        # 写入与清除负缓存在同一把锁内完成，与 is_schema_registered 的负缓存写入互斥
         with cls._lock:
             cls._schemas[service_type][name] = config_class
-            logger.info(f"Registered config schema for {service_type}/{name}: {config_class.__name__}")
+            cls._missing_schemas.discard((service_type, name))
+            logger.info(
+                "Registered config schema for %s/%s: %s",
+                service_type,
+                name,
+                config_class.__name__,
+            )
 
     @classmethod
     def configure_db(
@@ -310,10 +340,14 @@ class ConfigManager:
             config = ConfigManager.get_config("llm", "doubao")
             _ = config.api_key  # 访问配置字段
         """
-        if service_type not in cls._schemas:
-            raise ValueError(f"Unsupported service_type: {service_type}")
+        if not reload and not user_id:
+            cached = cls._configs_flat.get((service_type, name))
+            if cached is not None and cls._is_cache_fresh(service_type, name):
+                return cached
 
-        if name not in cls._schemas[service_type]:
+        if not cls.is_schema_registered(service_type, name):
+            if service_type not in cls._schemas:
+                raise ValueError(f"Unsupported service_type: {service_type}")
             available = list(cls._schemas[service_type].keys())
             raise ValueError(f"No config schema registered for {service_type}/{name}. Available: {available}")
 
@@ -342,7 +376,10 @@ class ConfigManager:
                 cls._cache_config(service_type, name, config_instance, None)
             except ValidationError as exc:
                 logger.error(
-                    f"Config validation failed for {service_type}/{name}: {exc}",
+                    "Config validation failed for %s/%s: %s",
+                    service_type,
+                    name,
+                    exc,
                     exc_info=True,
                 )
                 raise
@@ -364,7 +401,7 @@ class ConfigManager:
             cls.get_config(service_type, name, reload=True)
             return True
         except (ValueError, ValidationError) as exc:
-            logger.warning(f"Config validation failed for {service_type}/{name}: {exc}")
+            logger.warning("Config validation failed for %s/%s: %s", service_type, name, exc)
             return False
 
     @classmethod
@@ -410,7 +447,19 @@ class ConfigManager:
         Returns:
             True 如果已注册，否则 False
         """
-        return service_type in cls._schemas and name in cls._schemas[service_type]
+        key = (service_type, name)
+        if key in cls._missing_schemas:
+            return False
+        if service_type in cls._schemas and name in cls._schemas[service_type]:
+            return True
+        # 负缓存在锁内复查后写入：避免与 register_schema 交错，把刚注册的 schema 记成缺失
+        with cls._lock:
+            if service_type in cls._schemas and name in cls._schemas[service_type]:
+                return True
+            if len(cls._missing_schemas) >= cls._MISSING_SCHEMAS_MAX:
+                cls._missing_schemas.clear()
+            cls._missing_schemas.add(key)
+        return False
 
     @classmethod
     def list_schemas(cls, service_type: str) -> list[str]:
@@ -444,13 +493,16 @@ class ConfigManager:
                     cls._config_timestamps[service_type].clear()
                     cls._user_configs[service_type].clear()
                     cls._user_timestamps[service_type].clear()
-                    logger.info(f"Cleared all {service_type} configs")
+                    for key in [key for key in cls._configs_flat if key[0] == service_type]:
+                        del cls._configs_flat[key]
+                    logger.info("Cleared all %s configs", service_type)
             else:
                 for svc_type in cls._configs:
                     cls._configs[svc_type].clear()
                     cls._config_timestamps[svc_type].clear()
                     cls._user_configs[svc_type].clear()
                     cls._user_timestamps[svc_type].clear()
+                cls._configs_flat.clear()
                 logger.info("Cleared all configs")
 
     @classmethod
@@ -518,6 +570,7 @@ class ConfigManager:
             cls._user_timestamps[service_type].setdefault(user_id, {})[name] = time.time()
             return
         cls._configs[service_type][name] = config
+        cls._configs_flat[(service_type, name)] = config
         cls._config_timestamps[service_type][name] = time.time()
 
     @classmethod
@@ -627,7 +680,7 @@ class ConfigManager:
         """
         # 检查服务类型是否在映射表中
         if service_type not in cls._CONFIG_MAPPING:
-            logger.warning(f"Unknown service_type: {service_type}")
+            logger.warning("Unknown service_type: %s", service_type)
             return {}
 
         # 检查服务名称是否在映射表中
@@ -638,16 +691,20 @@ class ConfigManager:
         field_mapping = cls._CONFIG_MAPPING[service_type][name]
         config_data: dict[str, Any] = {}
 
+        # settings 实例的字段值字典（活视图，运行时 setattr 立即可见）：
+        # 循环内用 dict.get 取值，绕开逐字段 getattr 的属性解析
+        settings_values = vars(settings)
+
         # 数据驱动加载：遍历映射表，从 settings 读取对应的值
         for field_name, settings_attr in field_mapping.items():
-            value = getattr(settings, settings_attr, None)
+            value = settings_values.get(settings_attr)
 
             # 特殊处理：COS 的 secret_id/secret_key 回退到 TENCENT_*
             if value is None and service_type == "storage" and name == "cos":
                 if field_name == "secret_id":
-                    value = getattr(settings, "TENCENT_SECRET_ID", None)
+                    value = settings_values.get("TENCENT_SECRET_ID")
                 elif field_name == "secret_key":
-                    value = getattr(settings, "TENCENT_SECRET_KEY", None)
+                    value = settings_values.get("TENCENT_SECRET_KEY")
 
             # 只添加非 None 的值
             if value is not None:
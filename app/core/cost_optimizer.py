@@ -7,11 +7,16 @@ from __future__ import annotations
 
 import json
 import logging
+import operator
 import threading
-from collections import defaultdict
-from dataclasses import asdict, dataclass
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from enum import StrEnum
+from functools import lru_cache
 from typing import Any
 
 from app.core.health_checker import HealthChecker
@@ -19,6 +24,85 @@ from app.core.registry import ServiceMetadata, ServiceRegistry
 
 logger = logging.getLogger(__name__)
 
+# 成本记录在 Redis 中的保留时长（90 天）
+_COST_KEY_TTL_SECONDS = 90 * 24 * 3600
+# 同一 key 的 EXPIRE 至多每天续期一次；记住最近续期过的 key 数量上限
+_TTL_REFRESH_INTERVAL_SECONDS = 24 * 3600
+_TTL_KEYS_MAX = 1024
+# 全局时间索引：member 为 "{service_type}:{service_name}:{uuid}"，score 为时间戳，
+# 按时间范围定位有记录的 cost:records:* key，替代 SCAN 全键空间
+_RECORDS_INDEX_KEY = "cost:records:_all"
+# 索引开始写入的时间戳（SET NX，只记第一次）。索引上线前写入的记录不在索引里：
+# 查询区间早于该时刻且这些旧记录仍在保留期内时，回退到 SCAN cost:records:*
+_RECORDS_INDEX_SINCE_KEY = "cost:records:_all:since"
+# 策略排序用的 C 实现 key 函数
+_cost_key = operator.attrgetter("estimated_cost")
+_combined_key = operator.attrgetter("combined_score")
+
+# 性能分是 (priority, rate_limit) 的纯函数，按该二元组缓存，元数据变更自然命中新 key
+_perf_score_cache: dict[tuple[int, int], float] = {}
+
+
+def _estimate_tokens(service: Any, params: dict[str, Any]) -> float:
+    return service.estimate_cost(int(params.get("input_tokens", 0)), int(params.get("output_tokens", 0)))
+
+
+def _estimate_seconds(service: Any, params: dict[str, Any]) -> float:
+    return service.estimate_cost(int(params.get("duration_seconds", 0)))
+
+
+def _estimate_hours(service: Any, params: dict[str, Any]) -> float:
+    return service.estimate_cost(int(float(params.get("duration_hours", 0.0)) * 3600))
+
+
+def _estimate_storage(service: Any, params: dict[str, Any]) -> float:
+    return service.estimate_cost(float(params.get("storage_gb", 0.0)), int(params.get("requests", 0)))
+
+
+def _estimate_zero(service: Any, params: dict[str, Any]) -> float:
+    return 0.0
+
+
+# 估算参数分派：按优先级排列 (触发参数, 处理函数)，命中多组时取靠前者
+_ESTIMATE_RULES: tuple[tuple[frozenset[str], Callable[[Any, dict[str, Any]], float]], ...] = (
+    (frozenset({"input_tokens", "output_tokens"}), _estimate_tokens),
+    (frozenset({"duration_seconds"}), _estimate_seconds),
+    (frozenset({"duration_hours"}), _estimate_hours),
+    (frozenset({"storage_gb", "requests"}), _estimate_storage),
+)
+_KNOWN_ESTIMATE_KEYS: frozenset[str] = frozenset().union(*(keys for keys, _ in _ESTIMATE_RULES))
+
+
+def _build_estimate_dispatch() -> dict[frozenset[str], Callable[[Any, dict[str, Any]], float]]:
+    """为已知参数的全部子集预先解析处理函数，运行时一次集合求交 + 一次字典查找。"""
+    known = sorted(_KNOWN_ESTIMATE_KEYS)
+    dispatch: dict[frozenset[str], Callable[[Any, dict[str, Any]], float]] = {}
+    for mask in range(1, 1 << len(known)):
+        keyset = frozenset(key for i, key in enumerate(known) if mask >> i & 1)
+        dispatch[keyset] = next(handler for keys, handler in _ESTIMATE_RULES if keys & keyset)
+    return dispatch
+
+
+_ESTIMATE_DISPATCH = _build_estimate_dispatch()
+
+# Redis 模式下每日总成本的进程内缓存有效期（秒）；本进程写入会同步累加
+_DAILY_TOTAL_CACHE_TTL_SECONDS = 1.0
+
+# 原子预算预占：汇总当日 hash，未超预算则直接累加本次成本。
+# KEYS[1]=cost:daily:{date}；ARGV: 本次成本、每日预算、hash 字段、TTL 秒数。
+# 返回 {是否允许, 当前总额}；总额以字符串返回，避免 Lua number 转换截断小数。
+_BUDGET_RESERVE_LUA = """
+local cur = 0
+for _, v in ipairs(redis.call('HVALS', KEYS[1])) do cur = cur + tonumber(v) end
+local cost = tonumber(ARGV[1])
+if cur + cost > tonumber(ARGV[2]) then
+  return {0, tostring(cur)}
+end
+redis.call('HINCRBYFLOAT', KEYS[1], ARGV[3], cost)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {1, tostring(cur + cost)}
+"""
+
 
 class CostStrategy(StrEnum):
     """成本优化策略"""
@@ -42,6 +126,7 @@ class CostOptimizerConfig:
     enable_cost_tracking: bool = True
     enable_health_filter: bool = True
     enable_redis_persistence: bool = True  # P2-2: 启用 Redis 持久化
+    max_records: int = 100_000  # 内存模式最多保留的使用记录条数（超出淘汰最旧）
 
 
 @dataclass
@@ -52,7 +137,8 @@ class ServiceCostInfo:
     estimated_cost: float
     performance_score: float
     combined_score: float
-    metadata: dict[str, Any]
+    # 直接引用注册表中的元数据对象（只读），不再逐次复制为 dict
+    metadata: ServiceMetadata
 
 
 class CostOptimizer:
@@ -60,12 +146,23 @@ class CostOptimizer:
 
     def __init__(self, config: CostOptimizerConfig):
         self.config = config
+        # 策略分发表：按 config.strategy 一次查表，未知策略回退到最低成本
+        self._strategy_dispatch: dict[str, Callable[[list[ServiceCostInfo]], ServiceCostInfo | None]] = {
+            CostStrategy.LOWEST_COST: self._strategy_lowest_cost,
+            CostStrategy.COST_PERFORMANCE_BALANCE: self._strategy_cost_performance_balance,
+            CostStrategy.BUDGET_CONSTRAINED: self._strategy_budget_constrained,
+            CostStrategy.COST_CEILING: self._strategy_cost_ceiling,
+        }
+        # 仅 COST_PERFORMANCE_BALANCE 需要综合分，其余策略综合分即成本
+        self._combined_dispatch: dict[str, Callable[[float, float], float]] = {
+            CostStrategy.COST_PERFORMANCE_BALANCE: self._balanced_score,
+        }
         if not config.enable_cost_tracking:
             self.tracker = None
         elif config.enable_redis_persistence:
             self.tracker = cost_tracker
         else:
-            self.tracker = CostTracker(use_redis=False)
+            self.tracker = CostTracker(use_redis=False, max_records=config.max_records)
 
     def select_service(
         self,
@@ -80,9 +177,12 @@ class CostOptimizer:
         if not available_services:
             return None
 
-        cost_infos = [
-            self._calculate_cost_info(service_type, service_name, request_params) for service_name in available_services
-        ]
+        cost_infos = self._calculate_cost_infos(service_type, available_services, request_params)
+
+        if self.tracker and self.config.strategy == CostStrategy.BUDGET_CONSTRAINED:
+            # 预算策略：预算检查与记账在 tracker 内原子完成，避免多 worker 并发超支
+            reserved = self._reserve_within_budget(service_type, request_params, cost_infos)
+            return reserved.service_name if reserved else None
 
         selected = self._apply_strategy(cost_infos)
         if not selected:
@@ -103,50 +203,44 @@ class CostOptimizer:
             return HealthChecker.get_healthy_services(service_type)
         return ServiceRegistry.list_services(service_type)
 
-    def _calculate_cost_info(
+    def _calculate_cost_infos(
         self,
         service_type: str,
-        service_name: str,
+        service_names: list[str],
         request_params: dict[str, Any],
-    ) -> ServiceCostInfo:
-        service = ServiceRegistry.get(service_type, service_name)
-        metadata = ServiceRegistry.get_metadata(service_type, service_name)
-        estimated_cost = self._estimate_cost(service, request_params)
-        performance_score = self._calculate_performance_score(metadata)
-        combined_score = self._calculate_combined_score(estimated_cost, performance_score)
+    ) -> list[ServiceCostInfo]:
+        """批量计算候选服务的成本信息。
 
-        return ServiceCostInfo(
-            service_name=service_name,
-            estimated_cost=estimated_cost,
-            performance_score=performance_score,
-            combined_score=combined_score,
-            metadata=dict(metadata.__dict__),
-        )
+        综合分函数与注册表查找在循环外解析一次，循环体只做每个候选必需的计算。
+        """
+        scorer = self._combined_dispatch.get(self.config.strategy)
+        get_service = ServiceRegistry.get
+        get_metadata = ServiceRegistry.get_metadata
+        estimate = self._estimate_cost
+        perf_score = self._calculate_performance_score
+
+        cost_infos: list[ServiceCostInfo] = []
+        for service_name in service_names:
+            metadata = get_metadata(service_type, service_name)
+            estimated_cost = estimate(get_service(service_type, service_name), request_params)
+            performance_score = perf_score(metadata)
+            cost_infos.append(
+                ServiceCostInfo(
+                    service_name=service_name,
+                    estimated_cost=estimated_cost,
+                    performance_score=performance_score,
+                    combined_score=scorer(estimated_cost, performance_score) if scorer else estimated_cost,
+                    metadata=metadata,
+                )
+            )
+        return cost_infos
 
     def _estimate_cost(self, service: Any, request_params: dict[str, Any]) -> float:
         if not hasattr(service, "estimate_cost"):
             return 0.0
 
-        if "input_tokens" in request_params or "output_tokens" in request_params:
-            return service.estimate_cost(
-                int(request_params.get("input_tokens", 0)),
-                int(request_params.get("output_tokens", 0)),
-            )
-
-        if "duration_seconds" in request_params:
-            return service.estimate_cost(int(request_params.get("duration_seconds", 0)))
-
-        if "duration_hours" in request_params:
-            hours = float(request_params.get("duration_hours", 0.0))
-            return service.estimate_cost(int(hours * 3600))
-
-        if "storage_gb" in request_params or "requests" in request_params:
-            return service.estimate_cost(
-                float(request_params.get("storage_gb", 0.0)),
-                int(request_params.get("requests", 0)),
-            )
-
-        return 0.0
+        handler = _ESTIMATE_DISPATCH.get(_KNOWN_ESTIMATE_KEYS.intersection(request_params), _estimate_zero)
+        return handler(service, request_params)
 
     def estimate_request_cost(
         self,
@@ -158,53 +252,98 @@ class CostOptimizer:
         return self._estimate_cost(service, request_params)
 
     def _calculate_performance_score(self, metadata: ServiceMetadata) -> float:
+        key = (metadata.priority, metadata.rate_limit)
+        cached = _perf_score_cache.get(key)
+        if cached is not None:
+            return cached
+
         score = 0.0
         score += 100.0 / max(metadata.priority, 1)
         if metadata.rate_limit > 0:
             score += metadata.rate_limit / 1000.0
+        _perf_score_cache[key] = score
         return score
 
     def _calculate_combined_score(self, cost: float, performance: float) -> float:
-        if self.config.strategy == CostStrategy.LOWEST_COST:
+        scorer = self._combined_dispatch.get(self.config.strategy)
+        if scorer is None:
             return cost
+        return scorer(cost, performance)
 
-        if self.config.strategy == CostStrategy.COST_PERFORMANCE_BALANCE:
-            performance_term = 1 / max(performance, 0.1)
-            return cost * self.config.cost_weight + performance_term * self.config.performance_weight
-
-        return cost
+    def _balanced_score(self, cost: float, performance: float) -> float:
+        performance_term = 1 / max(performance, 0.1)
+        return cost * self.config.cost_weight + performance_term * self.config.performance_weight
 
     def _apply_strategy(self, cost_infos: list[ServiceCostInfo]) -> ServiceCostInfo | None:
         if not cost_infos:
             return None
 
-        if self.config.strategy == CostStrategy.LOWEST_COST:
-            return min(cost_infos, key=lambda info: info.estimated_cost)
-
-        if self.config.strategy == CostStrategy.COST_PERFORMANCE_BALANCE:
-            return min(cost_infos, key=lambda info: info.combined_score)
-
-        if self.config.strategy == CostStrategy.BUDGET_CONSTRAINED:
-            within_budget = [info for info in cost_infos if self._check_budget(info.estimated_cost)]
-            if not within_budget:
-                return None
-            return max(within_budget, key=lambda info: info.performance_score)
+        strategy = self._strategy_dispatch.get(self.config.strategy, self._strategy_lowest_cost)
+        return strategy(cost_infos)
+
+    def _strategy_lowest_cost(self, cost_infos: list[ServiceCostInfo]) -> ServiceCostInfo | None:
+        return min(cost_infos, key=_cost_key)
+
+    def _strategy_cost_performance_balance(self, cost_infos: list[ServiceCostInfo]) -> ServiceCostInfo | None:
+        return min(cost_infos, key=_combined_key)
+
+    def _strategy_budget_constrained(self, cost_infos: list[ServiceCostInfo]) -> ServiceCostInfo | None:
+        # 当日已用成本只查一次，过滤与取最大性能分合并为单次遍历
+        today_used = self._get_today_cost()
+        best: ServiceCostInfo | None = None
+        for info in cost_infos:
+            if not self._check_budget(info.estimated_cost, today_used):
+                continue
+            if best is None or info.performance_score > best.performance_score:
+                best = info
+        return best
+
+    def _strategy_cost_ceiling(self, cost_infos: list[ServiceCostInfo]) -> ServiceCostInfo | None:
+        min_cost = min(info.estimated_cost for info in cost_infos)
+        ceiling = min_cost * self.config.cost_ceiling_ratio
+        best: ServiceCostInfo | None = None
+        for info in cost_infos:
+            if info.estimated_cost > ceiling:
+                continue
+            if best is None or info.performance_score > best.performance_score:
+                best = info
+        return best
+
+    def _reserve_within_budget(
+        self,
+        service_type: str,
+        request_params: dict[str, Any],
+        cost_infos: list[ServiceCostInfo],
+    ) -> ServiceCostInfo | None:
+        """按性能分从高到低尝试原子预占预算，返回首个预占成功的服务。
 
-        if self.config.strategy == CostStrategy.COST_CEILING:
-            min_cost = min(info.estimated_cost for info in cost_infos)
-            ceiling = min_cost * self.config.cost_ceiling_ratio
-            within_ceiling = [info for info in cost_infos if info.estimated_cost <= ceiling]
-            if not within_ceiling:
-                return None
-            return max(within_ceiling, key=lambda info: info.performance_score)
+        先用（缓存的）当日成本做本地预筛，通常首个候选即预占成功，一次往返完成检查+记账。
+        """
+        today_used = self._get_today_cost()
+        candidates = [info for info in cost_infos if self._check_budget(info.estimated_cost, today_used)]
+        candidates.sort(key=lambda info: info.performance_score, reverse=True)
+        for info in candidates:
+            if self.tracker.reserve_usage(
+                service_type,
+                info.service_name,
+                request_params,
+                info.estimated_cost,
+                self.config.daily_budget,
+            ):
+                return info
+        return None
 
-        return min(cost_infos, key=lambda info: info.estimated_cost)
+    def _get_today_cost(self) -> float:
+        if not self.tracker:
+            return 0.0
+        return self.tracker.get_daily_cost(datetime.now().date())
 
-    def _check_budget(self, estimated_cost: float) -> bool:
+    def _check_budget(self, estimated_cost: float, today_used: float | None = None) -> bool:
         if not self.tracker:
             return True
 
-        today_used = self.tracker.get_daily_cost(datetime.now().date())
+        if today_used is None:
+            today_used = self._get_today_cost()
         return (today_used + estimated_cost) <= self.config.daily_budget
 
     def get_cost_ranking(
@@ -216,8 +355,9 @@ class CostOptimizer:
         available_services = (
             candidate_services if candidate_services is not None else self._get_available_services(service_type)
         )
-        cost_infos = [self._calculate_cost_info(service_type, name, request_params) for name in available_services]
-        return sorted(cost_infos, key=lambda info: info.estimated_cost)
+        cost_infos = self._calculate_cost_infos(service_type, available_services, request_params)
+        cost_infos.sort(key=_cost_key)
+        return cost_infos
 
 
 @dataclass
@@ -243,11 +383,18 @@ class CostTracker:
       * hash: cost:daily:{date}
     """
 
-    def __init__(self, use_redis: bool = True) -> None:
+    def __init__(self, use_redis: bool = True, max_records: int = 100_000) -> None:
         self._use_redis = use_redis
         self._lock = threading.Lock()
-        self._records: list[UsageRecord] = []
+        # 内存模式：有界记录队列 + 按日期分桶索引，范围查询只遍历相关日期
+        self._records: deque[UsageRecord] = deque(maxlen=max_records)
+        self._by_date: dict[date, deque[UsageRecord]] = {}
         self._daily_cache: dict[date, float] = {}
+        # 本进程最近设置过 TTL 的 Redis key -> 设置时刻（monotonic），LRU 有界
+        self._ttl_set_at: OrderedDict[str, float] = OrderedDict()
+        # Redis 模式每日总成本缓存：date -> (总成本, 缓存时刻 monotonic)
+        self._daily_total_cache: dict[date, tuple[float, float]] = {}
+        self._budget_reserve_script: Any = None
 
         # 内存模式（回退方案）
         if not use_redis:
@@ -260,11 +407,13 @@ class CostTracker:
             from worker.redis_client import get_sync_redis_client
 
             self._redis_client = get_sync_redis_client()
+            self._budget_reserve_script = self._redis_client.register_script(_BUDGET_RESERVE_LUA)
             logger.info("CostTracker initialized with Redis persistence")
         except Exception as exc:
             logger.warning(f"Failed to initialize Redis for CostTracker, falling back to memory mode: {exc}")
             self._use_redis = False
-            self._records = []
+            self._records.clear()
+            self._by_date.clear()
             self._daily_cache = {}
             self._redis_client = None
 
@@ -278,61 +427,197 @@ class CostTracker:
         """记录使用情况
 
         Redis 模式：存储到 sorted set（按时间戳排序）和 hash（每日汇总）
-        内存模式：存储到列表
+        内存模式：存储到有界队列，并按日期建索引
         """
+        # 只取一次系统时间：datetime 与 sorted set 的 score 共用同一时间戳
+        now_ts = time.time()
         record = UsageRecord(
-            timestamp=datetime.now(),
+            timestamp=datetime.fromtimestamp(now_ts),
             service_type=service_type,
             service_name=service_name,
             request_params=request_params,
             estimated_cost=estimated_cost,
         )
 
+        client = self._redis_client
+        if self._use_redis and client:
+            # Redis 命令在服务端原子执行，网络往返不持锁；_lock 只保护本地状态
+            self._record_to_redis(record, client, now_ts)
+            return
+
         with self._lock:
-            if self._use_redis and self._redis_client:
-                self._record_to_redis(record)
+            self._append_record(record)
+
+    def reserve_usage(
+        self,
+        service_type: str,
+        service_name: str,
+        request_params: dict[str, Any],
+        estimated_cost: float,
+        daily_budget: float,
+    ) -> bool:
+        """在每日预算内记录使用情况；超预算时不记录并返回 False。
+
+        Redis 模式：预算检查与每日汇总累加由同一个 Lua 脚本原子完成（一次往返），
+        多 worker 并发时不会出现“检查后、记账前”被其他进程挤占的超支。
+        内存模式：在 _lock 内检查并写入。
+
+        Redis 往返不持有 _lock，多线程的预占请求可并发发出。
+        """
+        # 只取一次系统时间：datetime 与 sorted set 的 score 共用同一时间戳
+        now_ts = time.time()
+        record = UsageRecord(
+            timestamp=datetime.fromtimestamp(now_ts),
+            service_type=service_type,
+            service_name=service_name,
+            request_params=request_params,
+            estimated_cost=estimated_cost,
+        )
+        record_date = record.timestamp.date()
+
+        client = self._redis_client
+        script = self._budget_reserve_script
+        if self._use_redis and client and script:
+            try:
+                allowed, current = script(
+                    keys=[_daily_key(record_date)],
+                    args=[
+                        estimated_cost,
+                        daily_budget,
+                        f"{service_type}:{service_name}",
+                        _COST_KEY_TTL_SECONDS,
+                    ],
+                )
+            except Exception as exc:
+                logger.error(f"Failed to reserve budget in Redis: {exc}", exc_info=True)
+                self._use_redis = False
+                self._redis_client = None
             else:
-                self._records.append(record)
-                today = record.timestamp.date()
-                self._daily_cache[today] = self._daily_cache.get(today, 0.0) + estimated_cost
+                self._daily_total_cache[record_date] = (float(current), time.monotonic())
+                if not int(allowed):
+                    return False
+                self._record_to_redis(record, client, now_ts, include_daily=False)
+                return True
 
-    def _record_to_redis(self, record: UsageRecord) -> None:
-        """将记录存储到 Redis（内部方法）"""
+        with self._lock:
+            if self._daily_cache.get(record_date, 0.0) + estimated_cost > daily_budget:
+                return False
+            self._append_record(record)
+            return True
+
+    def _record_to_redis(
+        self,
+        record: UsageRecord,
+        client: Any,
+        timestamp_score: float,
+        include_daily: bool = True,
+    ) -> None:
+        """将记录存储到 Redis（内部方法，调用方不持有 _lock）
+
+        timestamp_score 为 record.timestamp 对应的 epoch 秒，由调用方一并传入避免往返换算；
+        include_daily=False 时跳过每日汇总 hash（已由预算预占脚本累加）。
+        """
         try:
             # 生成唯一 key
-            record_key = f"cost:records:{record.service_type}:{record.service_name}"
-            daily_key = f"cost:daily:{record.timestamp.date().isoformat()}"
-
-            # 序列化记录（排除 timestamp，使用 score 代替）
-            record_dict = asdict(record)
-            record_dict["timestamp"] = record.timestamp.isoformat()
+            field = f"{record.service_type}:{record.service_name}"
+            record_key = _record_key(field)
+            record_date = record.timestamp.date()
+            daily_key = _daily_key(record_date)
+
+            # 序列化记录：按字段直接构造，避免 asdict 对 request_params 的递归深拷贝
+            record_dict = {
+                "timestamp": record.timestamp.isoformat(),
+                "service_type": record.service_type,
+                "service_name": record.service_name,
+                "request_params": record.request_params,
+                "estimated_cost": record.estimated_cost,
+                "actual_cost": record.actual_cost,
+            }
             record_json = json.dumps(record_dict)
 
+            # 所有写命令走同一个 pipeline：一次网络往返
+            pipe = client.pipeline(transaction=False)
+
             # 使用 sorted set 存储（score 为时间戳，便于时间范围查询）
-            timestamp_score = record.timestamp.timestamp()
-            self._redis_client.zadd(record_key, {record_json: timestamp_score})
+            pipe.zadd(record_key, {record_json: timestamp_score})
 
             # 更新每日汇总（使用 hash 的 hincrby）
-            field = f"{record.service_type}:{record.service_name}"
-            self._redis_client.hincrbyfloat(daily_key, field, record.estimated_cost)
-
-            # 设置 TTL（保留 90 天）
-            self._redis_client.expire(record_key, 90 * 24 * 3600)
-            self._redis_client.expire(daily_key, 90 * 24 * 3600)
+            ttl_keys = [record_key]
+            if include_daily:
+                pipe.hincrbyfloat(daily_key, field, record.estimated_cost)
+                ttl_keys.append(daily_key)
+
+            # 写入全局时间索引
+            pipe.zadd(_RECORDS_INDEX_KEY, {f"{field}:{uuid.uuid4().hex}": timestamp_score})
+
+            # 设置 TTL（保留 90 天）；近期已续期的 key 跳过，稳态下每条记录只剩 3 条命令
+            now = time.monotonic()
+            with self._lock:
+                for key in ttl_keys:
+                    if self._needs_ttl(key, now):
+                        pipe.expire(key, _COST_KEY_TTL_SECONDS)
+                # 索引 key 长期存在，按同样节奏裁掉保留期之外的 member
+                if self._needs_ttl(_RECORDS_INDEX_KEY, now):
+                    pipe.zremrangebyscore(_RECORDS_INDEX_KEY, "-inf", timestamp_score - _COST_KEY_TTL_SECONDS)
+                    pipe.set(_RECORDS_INDEX_SINCE_KEY, timestamp_score, nx=True)
+
+            pipe.execute()
+
+            # 本进程的写入直接累加到已缓存的当日总额，避免下一次预算检查回源 Redis；
+            # 保留原读取时刻，缓存仍在最后一次真实读取 Redis 后按 TTL 过期，才能看到其他 worker 的花费
+            if include_daily:
+                with self._lock:
+                    cached = self._daily_total_cache.get(record_date)
+                    if cached is not None:
+                        self._daily_total_cache[record_date] = (cached[0] + record.estimated_cost, cached[1])
 
         except Exception as exc:
             logger.error(f"Failed to record usage to Redis: {exc}", exc_info=True)
-            self._fallback_to_memory(record)
+            with self._lock:
+                self._fallback_to_memory(record)
+
+    def _needs_ttl(self, key: str, now: float) -> bool:
+        """判断 key 是否需要（重新）设置 TTL，并记录本次设置时刻（now 为 monotonic 时刻）。"""
+        set_at = self._ttl_set_at.get(key)
+        if set_at is not None and now - set_at < _TTL_REFRESH_INTERVAL_SECONDS:
+            return False
+        self._ttl_set_at[key] = now
+        self._ttl_set_at.move_to_end(key)
+        if len(self._ttl_set_at) > _TTL_KEYS_MAX:
+            self._ttl_set_at.popitem(last=False)
+        return True
 
     def _fallback_to_memory(self, record: UsageRecord) -> None:
         if self._use_redis:
             logger.warning("Falling back to in-memory cost tracking")
         self._use_redis = False
         self._redis_client = None
+        self._append_record(record)
+
+    def _append_record(self, record: UsageRecord) -> None:
+        """内存模式写入：维护有界队列、日期索引与每日汇总（调用方持有 _lock）。"""
+        if self._records.maxlen is not None and len(self._records) == self._records.maxlen:
+            evicted = self._records[0]
+            evicted_date = evicted.timestamp.date()
+            bucket = self._by_date[evicted_date]
+            bucket.popleft()
+            if not bucket:
+                del self._by_date[evicted_date]
         self._records.append(record)
+
         today = record.timestamp.date()
+        self._by_date.setdefault(today, deque()).append(record)
         self._daily_cache[today] = self._daily_cache.get(today, 0.0) + record.estimated_cost
 
+    def _records_between(self, start_date: date | None, end_date: date | None) -> Iterator[UsageRecord]:
+        """按日期索引遍历 [start_date, end_date] 内的内存记录（None 表示不设界）。"""
+        for record_date, bucket in self._by_date.items():
+            if start_date and record_date < start_date:
+                continue
+            if end_date and record_date > end_date:
+                continue
+            yield from bucket
+
     def get_records_in_range(
         self,
         start: datetime,
@@ -347,7 +632,7 @@ class CostTracker:
 
             return [
                 record
-                for record in self._records
+                for record in self._records_between(start.date(), end.date())
                 if start <= record.timestamp <= end
                 and (not service_type or record.service_type == service_type)
                 and (not service_name or record.service_name == service_name)
@@ -365,15 +650,28 @@ class CostTracker:
             end_ts = end.timestamp()
 
             if service_type and service_name:
-                pattern = f"cost:records:{service_type}:{service_name}"
-            elif service_type:
-                pattern = f"cost:records:{service_type}:*"
+                keys = [_record_key(f"{service_type}:{service_name}")]
             else:
-                pattern = "cost:records:*"
+                # 索引起始时刻与区间内的索引 member 一次往返取回
+                index_pipe = self._redis_client.pipeline(transaction=False)
+                index_pipe.get(_RECORDS_INDEX_SINCE_KEY)
+                index_pipe.zrangebyscore(_RECORDS_INDEX_KEY, start_ts, end_ts)
+                since, members = index_pipe.execute()
+                if _index_may_miss_records(since, start_ts):
+                    keys = self._scan_record_keys(service_type)
+                else:
+                    # 从全局索引取出时间范围内出现过的 service_type:service_name
+                    fields = sorted({member.rsplit(":", 1)[0] for member in members})
+                    if service_type:
+                        fields = [field for field in fields if field.split(":", 1)[0] == service_type]
+                    keys = [_record_key(field) for field in fields]
+
+            pipe = self._redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.zrangebyscore(key, start_ts, end_ts)
 
             records: list[UsageRecord] = []
-            for key in self._redis_client.scan_iter(match=pattern, count=100):
-                raw_records = self._redis_client.zrangebyscore(key, start_ts, end_ts)
+            for raw_records in pipe.execute():
                 for raw in raw_records:
                     record_dict = json.loads(raw)
                     record_dict["timestamp"] = datetime.fromisoformat(record_dict["timestamp"])
@@ -385,6 +683,15 @@ class CostTracker:
             self._use_redis = False
             return []
 
+    def _scan_record_keys(self, service_type: str | None) -> list[str]:
+        """SCAN 出全部（或指定 service_type 的）cost:records:* key，排除全局索引自身。"""
+        pattern = f"cost:records:{service_type}:*" if service_type else "cost:records:*"
+        return sorted(
+            key
+            for key in self._redis_client.scan_iter(match=pattern, count=100)
+            if key not in (_RECORDS_INDEX_KEY, _RECORDS_INDEX_SINCE_KEY)
+        )
+
     def get_daily_summary(
         self,
         start_date: date,
@@ -396,10 +703,8 @@ class CostTracker:
                 return self._get_daily_summary_from_redis(start_date, end_date)
 
             summary: dict[date, dict[str, float]] = {}
-            for record in self._records:
+            for record in self._records_between(start_date, end_date):
                 record_date = record.timestamp.date()
-                if record_date < start_date or record_date > end_date:
-                    continue
                 summary.setdefault(record_date, {})
                 key = f"{record.service_type}:{record.service_name}"
                 summary[record_date][key] = summary[record_date].get(key, 0.0) + record.estimated_cost
@@ -411,48 +716,60 @@ class CostTracker:
         end_date: date,
     ) -> dict[date, dict[str, float]]:
         result: dict[date, dict[str, float]] = {}
-        current = start_date
+        days = _date_range(start_date, end_date)
 
-        while current <= end_date:
-            daily_key = f"cost:daily:{current.isoformat()}"
-            try:
-                daily_data = self._redis_client.hgetall(daily_key)
-            except Exception as exc:
-                logger.error(f"Failed to read daily cost from Redis: {exc}", exc_info=True)
-                self._use_redis = False
-                break
+        try:
+            daily_hashes = self._pipeline_daily(days, "hgetall")
+        except Exception as exc:
+            logger.error(f"Failed to read daily cost from Redis: {exc}", exc_info=True)
+            self._use_redis = False
+            return result
 
+        for current, daily_data in zip(days, daily_hashes, strict=True):
             if daily_data:
-                result[current] = {key.decode(): float(value.decode()) for key, value in daily_data.items()}
-
-            current += timedelta(days=1)
+                result[current] = {key: float(value) for key, value in daily_data.items()}
 
         return result
 
+    def _pipeline_daily(self, days: list[date], command: str) -> list[Any]:
+        """对每天的 cost:daily:{date} hash 批量执行同一条读命令（单次往返）。"""
+        pipe = self._redis_client.pipeline(transaction=False)
+        for day in days:
+            getattr(pipe, command)(_daily_key(day))
+        return pipe.execute()
+
     def get_daily_cost(self, target_date: date) -> float:
         """获取指定日期的总成本
 
         Redis 模式：从 cost:daily:{date} hash 读取
         内存模式：从缓存或遍历记录计算
         """
-        with self._lock:
-            if self._use_redis and self._redis_client:
-                return self._get_daily_cost_from_redis(target_date)
+        if self._use_redis and self._redis_client:
+            # 缓存条目整体替换（GIL 下原子），回源 Redis 时不持锁，避免阻塞写路径
+            return self._get_daily_cost_from_redis(target_date)
 
+        with self._lock:
             # 内存模式
             if target_date in self._daily_cache:
                 return self._daily_cache[target_date]
 
-            total = sum(record.estimated_cost for record in self._records if record.timestamp.date() == target_date)
+            total = sum(record.estimated_cost for record in self._by_date.get(target_date, ()))
             self._daily_cache[target_date] = total
             return total
 
     def _get_daily_cost_from_redis(self, target_date: date) -> float:
-        """从 Redis 获取每日成本（内部方法）"""
+        """从 Redis 获取每日成本（内部方法）
+
+        结果在进程内缓存 _DAILY_TOTAL_CACHE_TTL_SECONDS 秒，预算检查每次路由都会调用。
+        """
+        cached = self._daily_total_cache.get(target_date)
+        if cached is not None and time.monotonic() - cached[1] < _DAILY_TOTAL_CACHE_TTL_SECONDS:
+            return cached[0]
         try:
-            daily_key = f"cost:daily:{target_date.isoformat()}"
-            values = self._redis_client.hvals(daily_key)
-            return sum(float(v) for v in values) if values else 0.0
+            values = self._redis_client.hvals(_daily_key(target_date))
+            total = sum(float(v) for v in values) if values else 0.0
+            self._daily_total_cache[target_date] = (total, time.monotonic())
+            return total
         except Exception as exc:
             logger.error(f"Failed to get daily cost from Redis: {exc}", exc_info=True)
             self._use_redis = False
@@ -471,8 +788,9 @@ class CostTracker:
             # 内存模式
             return sum(
                 record.estimated_cost
-                for record in self._records
-                if record.timestamp.year == year and record.timestamp.month == month
+                for record_date, bucket in self._by_date.items()
+                if record_date.year == year and record_date.month == month
+                for record in bucket
             )
 
     def _get_monthly_cost_from_redis(self, year: int, month: int) -> float:
@@ -482,13 +800,9 @@ class CostTracker:
             from calendar import monthrange
 
             _, days_in_month = monthrange(year, month)
-            total = 0.0
+            days = [date(year, month, day) for day in range(1, days_in_month + 1)]
 
-            for day in range(1, days_in_month + 1):
-                target_date = date(year, month, day)
-                total += self._get_daily_cost_from_redis(target_date)
-
-            return total
+            return sum(float(v) for values in self._pipeline_daily(days, "hvals") for v in values)
         except Exception as exc:
             logger.error(f"Failed to get monthly cost from Redis: {exc}", exc_info=True)
             return 0.0
@@ -510,12 +824,7 @@ class CostTracker:
             # 内存模式
             breakdown: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
 
-            for record in self._records:
-                record_date = record.timestamp.date()
-                if start_date and record_date < start_date:
-                    continue
-                if end_date and record_date > end_date:
-                    continue
+            for record in self._records_between(start_date, end_date):
                 breakdown[record.service_type][record.service_name] += record.estimated_cost
 
             return {svc_type: dict(values) for svc_type, values in breakdown.items()}
@@ -535,20 +844,14 @@ class CostTracker:
             if not end_date:
                 end_date = date.today()
 
-            # 遍历日期范围
-            current = start_date
-            while current <= end_date:
-                daily_key = f"cost:daily:{current.isoformat()}"
-                daily_data = self._redis_client.hgetall(daily_key)
-
+            # 一次 pipeline 读取整个日期范围
+            for daily_data in self._pipeline_daily(_date_range(start_date, end_date), "hgetall"):
                 # 解析 hash 数据：{service_type:service_name: cost}
                 for field, cost_str in daily_data.items():
                     if ":" in field:
                         service_type, service_name = field.split(":", 1)
                         breakdown[service_type][service_name] += float(cost_str)
 
-                current += timedelta(days=1)
-
             return {svc_type: dict(values) for svc_type, values in breakdown.items()}
 
         except Exception as exc:
@@ -558,8 +861,14 @@ class CostTracker:
     def generate_report(self, start_date: date, end_date: date) -> CostReport:
         """生成成本报告
 
-        Redis/内存模式：使用已实现的 get_daily_cost 和 get_service_breakdown
+        Redis 模式：一次 pipeline 读取每日 hash，同一遍同时得出每日成本与服务明细
+        内存模式：使用已实现的 get_daily_cost 和 get_service_breakdown
         """
+        if self._use_redis and self._redis_client:
+            report = self._generate_report_from_redis(start_date, end_date)
+            if report is not None:
+                return report
+
         # 计算总成本
         total_cost = 0.0
         daily_costs: dict[date, float] = {}
@@ -582,6 +891,63 @@ class CostTracker:
             daily_costs=daily_costs,
         )
 
+    def _generate_report_from_redis(self, start_date: date, end_date: date) -> CostReport | None:
+        """从 Redis 生成成本报告（内部方法）；读取失败返回 None，由调用方走通用路径"""
+        try:
+            days = _date_range(start_date, end_date)
+            daily_costs: dict[date, float] = {}
+            breakdown: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+            for day, daily_data in zip(days, self._pipeline_daily(days, "hgetall"), strict=True):
+                daily_total = 0.0
+                for field, cost_str in daily_data.items():
+                    cost = float(cost_str)
+                    daily_total += cost
+                    if ":" in field:
+                        service_type, service_name = field.split(":", 1)
+                        breakdown[service_type][service_name] += cost
+                daily_costs[day] = daily_total
+        except Exception as exc:
+            logger.error(f"Failed to generate cost report from Redis: {exc}", exc_info=True)
+            return None
+
+        return CostReport(
+            start_date=start_date,
+            end_date=end_date,
+            total_cost=sum(daily_costs.values()),
+            service_breakdown={svc_type: dict(values) for svc_type, values in breakdown.items()},
+            daily_costs=daily_costs,
+        )
+
+
+@lru_cache(maxsize=4096)
+def _daily_key(day: date) -> str:
+    """cost:daily:{date} key；看板反复查询相同日期，缓存避免重复 isoformat 与拼接。"""
+    return f"cost:daily:{day.isoformat()}"
+
+
+def _index_may_miss_records(since: str | None, start_ts: float) -> bool:
+    """全局索引是否可能漏掉 start_ts 之后的记录。
+
+    索引从 since 时刻开始写入；更早的记录只在 cost:records:* 中，保留期过后自然消失。
+    since 缺失（还没有写入过索引）时同样不可信。
+    """
+    if since is None:
+        return True
+    since_ts = float(since)
+    return start_ts < since_ts and since_ts > time.time() - _COST_KEY_TTL_SECONDS
+
+
+@lru_cache(maxsize=1024)
+def _record_key(field: str) -> str:
+    """cost:records:{service_type}:{service_name} key，field 为 "service_type:service_name"。"""
+    return f"cost:records:{field}"
+
+
+def _date_range(start_date: date, end_date: date) -> list[date]:
+    """闭区间 [start_date, end_date] 内的每一天。"""
+    return [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
 
 cost_tracker = CostTracker(use_redis=True)
 
@@ -20,13 +20,14 @@ from __future__ import annotations
 import asyncio
 import inspect
 import logging
-from collections.abc import AsyncIterator, Callable
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from datetime import datetime
 from enum import StrEnum
-from functools import wraps
-from threading import Lock, RLock
+from functools import lru_cache, wraps
+from threading import Lock
 from typing import Any, TypeVar
 
 logger = logging.getLogger(__name__)
@@ -37,9 +38,9 @@ T = TypeVar("T")
 # ==================== 重试机制 ====================
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RetryConfig:
-    """重试配置
+    """重试配置（不可变，可作为退避延迟表的缓存键）
 
     Attributes:
         max_attempts: 最大尝试次数（包括首次调用）
@@ -56,6 +57,15 @@ class RetryConfig:
     jitter: bool = True
 
 
+@lru_cache(maxsize=128)
+def _backoff_delays(config: RetryConfig) -> tuple[float, ...]:
+    """第 n 次失败后的退避延迟（指数退避、封顶 max_delay，未加抖动）；相同配置的装饰器共享同一张表"""
+    return tuple(
+        min(config.initial_delay * (config.exponential_base**i), config.max_delay)
+        for i in range(config.max_attempts - 1)
+    )
+
+
 def retry(
     config: RetryConfig | None = None,
     exceptions: tuple = (Exception,),
@@ -83,6 +93,9 @@ def retry(
     if config is None:
         config = RetryConfig()
 
+    # config 在装饰时即确定，重试路径只需查表
+    delays = _backoff_delays(config)
+
     def decorator(func: Callable) -> Callable:
         # 检测函数是否为异步函数
         is_async = inspect.iscoroutinefunction(func)
@@ -109,16 +122,11 @@ def retry(
                             )
                             raise
 
-                        # 计算延迟时间（指数退避）
-                        delay = min(
-                            config.initial_delay * (config.exponential_base ** (attempt - 1)),
-                            config.max_delay,
-                        )
+                        # 指数退避延迟已在装饰时预计算
+                        delay = delays[attempt - 1]
 
                         # 添加随机抖动（0-50% 的延迟）
                         if config.jitter:
-                            import random
-
                             delay = delay * (0.5 + random.random() * 0.5)  # nosec
 
                         logger.warning(
@@ -153,24 +161,17 @@ def retry(
                             )
                             raise
 
-                        # 计算延迟时间（指数退避）
-                        delay = min(
-                            config.initial_delay * (config.exponential_base ** (attempt - 1)),
-                            config.max_delay,
-                        )
+                        # 指数退避延迟已在装饰时预计算
+                        delay = delays[attempt - 1]
 
                         # 添加随机抖动（0-50% 的延迟）
                         if config.jitter:
-                            import random
-
                             delay = delay * (0.5 + random.random() * 0.5)  # nosec
 
                         logger.warning(
                             f"Retry {attempt}/{config.max_attempts} for {func.__name__} after {delay:.2f}s: {exc}"
                         )
 
-                        import time
-
                         time.sleep(delay)
 
                 # 理论上不会到达这里，但为了类型检查
@@ -185,16 +186,16 @@ def retry(
 
 
 class CircuitState(StrEnum):
-    """熔断器状态"""
+    """熔断器状态（成员为单例，CircuitBreaker 内部用 is 比较）"""
 
     CLOSED = "closed"  # 关闭（正常）
     OPEN = "open"  # 打开（熔断）
     HALF_OPEN = "half_open"  # 半开（探测）
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CircuitBreakerConfig:
-    """熔断器配置
+    """熔断器配置（不可变）
 
     Attributes:
         failure_threshold: 失败阈值（连续失败多少次后熔断）
@@ -221,16 +222,16 @@ class CircuitBreaker:
         HALF_OPEN -> OPEN: 任何失败
 
     使用示例:
-        breaker = CircuitBreaker("llm_service", config)
+        breaker = CircuitBreaker.get_or_create("llm_service", config)
 
         @breaker.protected
         async def call_llm():
             ...
     """
 
-    # 全局熔断器注册表
+    # 全局熔断器注册表（仅由 get_or_create 写入）
     _breakers: dict[str, CircuitBreaker] = {}
-    _lock = RLock()
+    _lock = Lock()
 
     def __init__(self, name: str, config: CircuitBreakerConfig | None = None):
         self.name = name
@@ -238,58 +239,73 @@ class CircuitBreaker:
         self.state = CircuitState.CLOSED
         self.failure_count = 0
         self.success_count = 0
-        self.last_failure_time: datetime | None = None
+        # 最近一次失败的 time.monotonic() 时刻；不受系统时钟调整影响
+        self.last_failure_time: float | None = None
         self._state_lock = Lock()
 
-        # 注册到全局注册表
-        with CircuitBreaker._lock:
-            CircuitBreaker._breakers[name] = self
-
     @classmethod
     def get_or_create(cls, name: str, config: CircuitBreakerConfig | None = None) -> CircuitBreaker:
-        """获取或创建熔断器"""
+        """获取或创建熔断器（同名复用；创建与注册在同一次加锁内完成）"""
+        breaker = cls._breakers.get(name)
+        if breaker is not None:
+            return breaker
         with cls._lock:
-            if name not in cls._breakers:
-                cls._breakers[name] = CircuitBreaker(name, config)
-            return cls._breakers[name]
+            breaker = cls._breakers.get(name)
+            if breaker is None:
+                breaker = cls(name, config)
+                cls._breakers[name] = breaker
+            return breaker
 
     def _should_attempt_reset(self) -> bool:
         """判断是否应该尝试重置（从 OPEN -> HALF_OPEN）"""
-        if self.state != CircuitState.OPEN:
+        if self.state is not CircuitState.OPEN:
             return False
 
         if self.last_failure_time is None:
             return True
 
-        elapsed = (datetime.now() - self.last_failure_time).total_seconds()
-        return elapsed >= self.config.timeout
+        return time.monotonic() - self.last_failure_time >= self.config.timeout
+
+    def _enter_half_open_if_due(self) -> None:
+        """OPEN 且熔断超时后切换到 HALF_OPEN；只有状态转换才加锁"""
+        if not self._should_attempt_reset():
+            return
+        with self._state_lock:
+            # 加锁后复查，避免并发请求重复转换、重置半开计数
+            if self._should_attempt_reset():
+                logger.info(f"Circuit breaker '{self.name}' entering HALF_OPEN state")
+                self.state = CircuitState.HALF_OPEN
+                self.success_count = 0
 
     def _record_success(self) -> None:
         """记录成功"""
+        # 稳态快速路径：CLOSED 且无失败计数时无需修改任何状态（GIL 下属性读取是原子的）
+        if self.state is CircuitState.CLOSED and self.failure_count == 0:
+            return
         with self._state_lock:
-            if self.state == CircuitState.HALF_OPEN:
+            if self.state is CircuitState.HALF_OPEN:
                 self.success_count += 1
                 if self.success_count >= self.config.success_threshold:
                     logger.info(f"Circuit breaker '{self.name}' recovered to CLOSED")
                     self.state = CircuitState.CLOSED
                     self.failure_count = 0
                     self.success_count = 0
-            elif self.state == CircuitState.CLOSED:
+            elif self.state is CircuitState.CLOSED:
                 # 重置失败计数
                 self.failure_count = 0
 
     def _record_failure(self) -> None:
         """记录失败"""
         with self._state_lock:
-            self.last_failure_time = datetime.now()
+            self.last_failure_time = time.monotonic()
 
-            if self.state == CircuitState.HALF_OPEN:
+            if self.state is CircuitState.HALF_OPEN:
                 # 半开状态下任何失败都会重新打开
                 logger.warning(f"Circuit breaker '{self.name}' reopened from HALF_OPEN")
                 self.state = CircuitState.OPEN
                 self.success_count = 0
 
-            elif self.state == CircuitState.CLOSED:
+            elif self.state is CircuitState.CLOSED:
                 self.failure_count += 1
                 if self.failure_count >= self.config.failure_threshold:
                     logger.warning(
@@ -312,14 +328,10 @@ class CircuitBreaker:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
             # 检查是否应该尝试重置
-            if self._should_attempt_reset():
-                with self._state_lock:
-                    logger.info(f"Circuit breaker '{self.name}' entering HALF_OPEN state")
-                    self.state = CircuitState.HALF_OPEN
-                    self.success_count = 0
+            self._enter_half_open_if_due()
 
             # 如果熔断器打开，快速失败
-            if self.state == CircuitState.OPEN:
+            if self.state is CircuitState.OPEN:
                 raise CircuitBreakerOpenError(f"Circuit breaker '{self.name}' is OPEN, failing fast")
 
             # 尝试调用
@@ -350,14 +362,10 @@ class CircuitBreaker:
                         yield chunk
         """
         # 检查是否应该尝试重置（与 protected 同口径）
-        if self._should_attempt_reset():
-            with self._state_lock:
-                logger.info(f"Circuit breaker '{self.name}' entering HALF_OPEN state")
-                self.state = CircuitState.HALF_OPEN
-                self.success_count = 0
+        self._enter_half_open_if_due()
 
         # 如果熔断器打开，快速失败（在 yield 之前抛出，调用方进入不了受保护代码段）
-        if self.state == CircuitState.OPEN:
+        if self.state is CircuitState.OPEN:
             raise CircuitBreakerOpenError(f"Circuit breaker '{self.name}' is OPEN, failing fast")
 
         try:
@@ -419,6 +427,9 @@ def fallback(fallback_func: Callable | None = None, default_value: Any = None) -
             ...
     """
 
+    # 降级策略在装饰时确定，失败路径上不再做协程函数检测
+    handler = _fallback_handler(fallback_func, default_value)
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -428,26 +439,82 @@ def fallback(fallback_func: Callable | None = None, default_value: Any = None) -
             except Exception as exc:
                 logger.warning(f"Function {func.__name__} failed, using fallback: {exc}")
 
-                if fallback_func is not None:
-                    # 调用降级函数
-                    if inspect.iscoroutinefunction(fallback_func):
-                        return await fallback_func(*args, **kwargs)
-                    else:
-                        return fallback_func(*args, **kwargs)
-
-                elif default_value is not None:
-                    # 返回默认值
-                    return default_value
-
-                else:
+                if handler is None:
                     # 没有降级策略，重新抛出异常
                     raise
+                return await handler(*args, **kwargs)
 
         return wrapper
 
     return decorator
 
 
+def _fallback_handler(fallback_func: Callable | None, default_value: Any) -> Callable[..., Awaitable[Any]] | None:
+    """把降级策略解析为统一的异步处理函数：降级函数优先，其次默认值；都没有时返回 None"""
+    if fallback_func is not None:
+        if inspect.iscoroutinefunction(fallback_func):
+            return fallback_func
+
+        async def _call_sync_fallback(*args: Any, **kwargs: Any) -> Any:
+            return fallback_func(*args, **kwargs)
+
+        return _call_sync_fallback
+
+    if default_value is not None:
+
+        async def _return_default(*args: Any, **kwargs: Any) -> Any:
+            return default_value
+
+        return _return_default
+
+    return None
+
+
+def _retry_with_fallback(
+    func: Callable,
+    config: RetryConfig,
+    handler: Callable[..., Awaitable[Any]],
+) -> Callable:
+    """重试 + 降级融合为单层包装：重试耗尽时直接调用降级，省去一层 await 与 raise/catch"""
+    delays = _backoff_delays(config)
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        for attempt in range(1, config.max_attempts + 1):
+            try:
+                return await func(*args, **kwargs)
+
+            except Exception as exc:
+                if attempt >= config.max_attempts:
+                    logger.error(
+                        "Retry exhausted for %s after %s attempts: %s",
+                        func.__name__,
+                        attempt,
+                        exc,
+                    )
+                    logger.warning("Function %s failed, using fallback: %s", func.__name__, exc)
+                    return await handler(*args, **kwargs)
+
+                delay = delays[attempt - 1]
+                if config.jitter:
+                    delay = delay * (0.5 + random.random() * 0.5)  # nosec
+
+                logger.warning(
+                    "Retry %s/%s for %s after %.2fs: %s",
+                    attempt,
+                    config.max_attempts,
+                    func.__name__,
+                    delay,
+                    exc,
+                )
+
+                await asyncio.sleep(delay)
+
+        return await handler(*args, **kwargs)
+
+    return wrapper
+
+
 # ==================== 组合使用示例 ====================
 
 
@@ -479,7 +546,18 @@ def resilient(
             ...
     """
 
+    handler = _fallback_handler(fallback_func, default_value)
+
     def decorator(func: Callable) -> Callable:
+        # 只有重试 + 降级（无熔断）时融合为单层包装；熔断器需要按整次调用计数，保持分层
+        if (
+            retry_config is not None
+            and handler is not None
+            and circuit_breaker_name is None
+            and inspect.iscoroutinefunction(func)
+        ):
+            return _retry_with_fallback(func, retry_config, handler)
+
         # 应用装饰器链：fallback -> circuit_breaker -> retry -> func
         result_func = func
 
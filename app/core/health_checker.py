@@ -20,10 +20,15 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import AsyncExitStack, ExitStack, contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from enum import StrEnum
 from threading import Lock
+from types import MappingProxyType
 from weakref import WeakKeyDictionary
 
 from app.core.registry import ServiceRegistry
@@ -32,7 +37,7 @@ logger = logging.getLogger(__name__)
 
 
 class HealthStatus(StrEnum):
-    """健康状态枚举"""
+    """健康状态枚举（成员为单例，HealthChecker 内部用 is 比较）"""
 
     HEALTHY = "healthy"  # 健康
     UNHEALTHY = "unhealthy"  # 不健康
@@ -40,7 +45,7 @@ class HealthStatus(StrEnum):
     CHECKING = "checking"  # 检查中
 
 
-@dataclass
+@dataclass(slots=True)
 class HealthCheckResult:
     """健康检查结果
 
@@ -48,7 +53,8 @@ class HealthCheckResult:
         service_type: 服务类型
         service_name: 服务名称
         status: 健康状态
-        last_check_time: 最后检查时间
+        last_check_time: 最后检查时间（用于展示）
+        last_check_monotonic: 最后检查的 time.monotonic() 时刻（用于缓存判断，0 表示未检查）
         consecutive_failures: 连续失败次数
         total_checks: 总检查次数
         total_failures: 总失败次数
@@ -59,6 +65,7 @@ class HealthCheckResult:
     service_name: str
     status: HealthStatus = HealthStatus.UNKNOWN
     last_check_time: datetime | None = None
+    last_check_monotonic: float = 0.0
     consecutive_failures: int = 0
     total_checks: int = 0
     total_failures: int = 0
@@ -112,14 +119,15 @@ class HealthChecker:
 
     # 类变量：存储健康检查结果
     # 格式: {service_type: {name: HealthCheckResult}}
-    _results: dict[str, dict[str, HealthCheckResult]] = {
-        "llm": {},
-        "asr": {},
-        "storage": {},
-    }
+    # 按需创建类型分组，新增服务类型无需修改此处
+    _results: defaultdict[str, dict[str, HealthCheckResult]] = defaultdict(dict)
 
-    # 线程锁：确保结果更新线程安全
-    _lock = Lock()
+    # 线程锁：按 service_type 分片，不同类型服务的结果更新互不阻塞；未知类型的锁懒创建
+    _locks: dict[str, Lock] = {service_type: Lock() for service_type in ("llm", "asr", "storage")}
+    _locks_guard = Lock()
+
+    # 健康服务快照（RCU 式发布）：{service_type: 健康服务名称元组}，读路径无锁
+    _healthy_snapshots: dict[str, tuple[str, ...]] = {}
 
     # 探测单飞（single-flight）：每个事件循环、每个服务一把 asyncio.Lock，串行化同一服务的并发探测，
     # 修复「锁在 await 期间释放 → 并发探测各自累加同一 result 计数 / 误判失败阈值」(D6)。
@@ -135,6 +143,28 @@ class HealthChecker:
     check_timeout: int = 5  # 检查超时时间（秒）
     cache_duration: int = 30  # 缓存时长（秒），ADR-003 要求
 
+    @classmethod
+    def _type_lock(cls, service_type: str) -> Lock:
+        """返回该服务类型的分片锁（未知类型懒创建）"""
+        lock = cls._locks.get(service_type)
+        if lock is None:
+            with cls._locks_guard:
+                lock = cls._locks.setdefault(service_type, Lock())
+        return lock
+
+    @classmethod
+    @contextmanager
+    def _all_locks(cls) -> Iterator[None]:
+        """按固定顺序获取全部分片锁（跨类型读取/清理时使用，固定顺序避免死锁）
+
+        全程持有 _locks_guard：期间 _type_lock 无法为新类型懒创建分片锁，新类型也被本次独占覆盖。
+        加锁顺序恒为 _locks_guard → 分片锁；_type_lock 只在未持有分片锁时获取 _locks_guard，不会死锁。
+        """
+        with cls._locks_guard, ExitStack() as stack:
+            for service_type in sorted(cls._locks):
+                stack.enter_context(cls._locks[service_type])
+            yield
+
     @classmethod
     def _probe_lock(cls, service_type: str, name: str) -> asyncio.Lock:
         """返回当前事件循环下该服务专属的 asyncio.Lock（懒创建，用于探测单飞）。
@@ -195,24 +225,64 @@ class HealthChecker:
             # 强制刷新
             result = await HealthChecker.check_service("llm", "doubao", force=True)
         """
-        # 获取或创建健康检查结果
-        with cls._lock:
-            if name not in cls._results[service_type]:
-                cls._results[service_type][name] = HealthCheckResult(
-                    service_type=service_type,
-                    service_name=name,
-                )
-            result = cls._results[service_type][name]
+        with cls._type_lock(service_type):
+            result, needs_probe = cls._begin_check(service_type, name, force)
+        if not needs_probe:
+            return result
+
+        try:
+            outcome = await cls._probe(service_type, name)
+        except asyncio.CancelledError:
+            cls._abort_checks([result])
+            raise
+
+        with cls._type_lock(service_type):
+            cls._commit_check(result, outcome)
+            cls._publish_healthy(service_type)
+        return result
 
-            # 检查缓存：如果在缓存时长内且不强制刷新，直接返回缓存结果（ADR-003）
-            if not force and result.last_check_time:
-                elapsed = (datetime.now() - result.last_check_time).total_seconds()
-                if elapsed < cls.cache_duration:
-                    return result
+    @classmethod
+    def _begin_check(cls, service_type: str, name: str, force: bool) -> tuple[HealthCheckResult, bool]:
+        """获取或创建结果并判断是否需要探测；需要时置为 CHECKING（调用方持有该类型的分片锁）"""
+        services = cls._results[service_type]
+        result = services.get(name)
+        if result is None:
+            result = services[name] = HealthCheckResult(
+                service_type=service_type,
+                service_name=name,
+            )
+
+        # 检查缓存：如果在缓存时长内且不强制刷新，直接返回缓存结果（ADR-003）
+        if (
+            not force
+            and result.last_check_monotonic
+            and time.monotonic() - result.last_check_monotonic < cls.cache_duration
+        ):
+            return result, False
+
+        was_healthy = result.status is HealthStatus.HEALTHY
+        result.status = HealthStatus.CHECKING
+        if was_healthy:
+            cls._publish_healthy(service_type)
+        return result, True
+
+    @classmethod
+    def _publish_healthy(cls, service_type: str) -> None:
+        """重建并发布该类型的健康服务快照（调用方持有该类型的分片锁）
+
+        快照是不可变 tuple，整体替换字典项（GIL 下原子），读者无需加锁即可拿到一致视图。
+        """
+        cls._healthy_snapshots[service_type] = tuple(
+            name for name, result in cls._results[service_type].items() if result.status is HealthStatus.HEALTHY
+        )
 
-            result.status = HealthStatus.CHECKING
+    @classmethod
+    async def _probe(cls, service_type: str, name: str) -> tuple[bool, str, bool]:
+        """调用服务的 health_check（不加任何锁）
 
-        # 执行健康检查
+        Returns:
+            (是否健康, 错误信息, 是否为致命错误)；取消（CancelledError）原样向上抛
+        """
         is_healthy = False
         error_msg = ""
         is_fatal_error = False  # 标记是否为致命错误（配置问题等）
@@ -244,17 +314,6 @@ class HealthChecker:
                 exc_info=True,
             )
 
-        except asyncio.CancelledError:
-            # 探测被取消（外层请求取消 / 超时 / worker 关停）：CancelledError 是 BaseException，
-            # 不会被下面的 except Exception 捕获；若不处理，status 会永久停在上面置的 CHECKING，
-            # 而 get_healthy/get_unhealthy 都不含 CHECKING → 该服务再不被重探、永久落选。
-            # 这里把仍处于 CHECKING 的状态退回 UNKNOWN 再向上抛，保持取消语义的同时让其可被重探
-            # （与 _select_service 重探所有「非 HEALTHY」服务呼应，D4）。
-            with cls._lock:
-                if result.status == HealthStatus.CHECKING:
-                    result.status = HealthStatus.UNKNOWN
-            raise
-
         except Exception as exc:
             # 其他异常（网络问题、临时故障等）：累积失败次数后才标记不健康
             error_msg = f"{type(exc).__name__}: {exc}"
@@ -263,67 +322,115 @@ class HealthChecker:
                 exc_info=True,
             )
 
-        # 更新结果
-        with cls._lock:
-            result.last_check_time = datetime.now()
-            result.total_checks += 1
+        return is_healthy, error_msg, is_fatal_error
 
-            if is_healthy:
-                result.status = HealthStatus.HEALTHY
-                result.consecutive_failures = 0
-                result.error_message = ""
-            else:
-                result.total_failures += 1
-                result.consecutive_failures += 1
-                result.error_message = error_msg
-
-                # 致命错误：立即标记为 UNHEALTHY（ADR-009 修复）
-                if is_fatal_error:
-                    result.status = HealthStatus.UNHEALTHY
-                    logger.warning(
-                        "Service %s/%s marked as UNHEALTHY due to fatal error: %s",
-                        service_type,
-                        name,
-                        error_msg,
-                    )
-                # 临时故障：判断是否超过失败阈值
-                elif result.consecutive_failures >= cls.failure_threshold:
-                    result.status = HealthStatus.UNHEALTHY
-                    logger.warning(
-                        f"Service {service_type}/{name} marked as UNHEALTHY "
-                        f"(consecutive failures: {result.consecutive_failures})"
-                    )
-                else:
-                    result.status = HealthStatus.HEALTHY  # 未超过阈值，仍认为健康
+    @classmethod
+    def _abort_checks(cls, results: list[HealthCheckResult]) -> None:
+        """探测被取消时把仍处于 CHECKING 的结果退回 UNKNOWN
 
-        return result
+        探测被取消（外层请求取消 / 超时 / worker 关停）：CancelledError 是 BaseException，
+        若不处理，status 会永久停在 CHECKING，而 get_healthy/get_unhealthy 都不含 CHECKING
+        → 该服务再不被重探、永久落选。退回 UNKNOWN 后可被重探
+        （与 _select_service 重探所有「非 HEALTHY」服务呼应，D4）。
+        """
+        for result in results:
+            with cls._type_lock(result.service_type):
+                if result.status is HealthStatus.CHECKING:
+                    result.status = HealthStatus.UNKNOWN
+
+    @classmethod
+    def _commit_check(cls, result: HealthCheckResult, outcome: tuple[bool, str, bool]) -> None:
+        """把一次探测结果写回 result（调用方持有该类型的分片锁）"""
+        is_healthy, error_msg, is_fatal_error = outcome
+        service_type, name = result.service_type, result.service_name
+
+        result.last_check_time = datetime.now()
+        result.last_check_monotonic = time.monotonic()
+        result.total_checks += 1
+
+        if is_healthy:
+            result.status = HealthStatus.HEALTHY
+            result.consecutive_failures = 0
+            result.error_message = ""
+        else:
+            result.total_failures += 1
+            result.consecutive_failures += 1
+            result.error_message = error_msg
+
+            # 致命错误：立即标记为 UNHEALTHY（ADR-009 修复）
+            if is_fatal_error:
+                result.status = HealthStatus.UNHEALTHY
+                logger.warning(
+                    "Service %s/%s marked as UNHEALTHY due to fatal error: %s",
+                    service_type,
+                    name,
+                    error_msg,
+                )
+            # 临时故障：判断是否超过失败阈值
+            elif result.consecutive_failures >= cls.failure_threshold:
+                result.status = HealthStatus.UNHEALTHY
+                logger.warning(
+                    f"Service {service_type}/{name} marked as UNHEALTHY "
+                    f"(consecutive failures: {result.consecutive_failures})"
+                )
+            else:
+                result.status = HealthStatus.HEALTHY  # 未超过阈值，仍认为健康
 
     @classmethod
-    async def check_all(cls) -> dict[str, dict[str, HealthCheckResult]]:
+    async def check_all(cls) -> dict[str, MappingProxyType[str, HealthCheckResult]]:
         """检查所有已注册服务的健康状态
 
+        先持有全部目标服务的单飞锁（按固定顺序获取），再在一次加锁内完成缓存判断、
+        并发探测（不持有线程锁），最后在一次加锁内写回全部结果：整轮只加两次分片锁。
+
         Returns:
-            所有服务的健康检查结果
+            所有服务的健康检查结果（只读视图，见 get_all_results）
 
         Example:
             results = await HealthChecker.check_all()
             # inspect results as needed
         """
-        tasks = []
-
-        # 为所有已注册服务创建检查任务
-        for service_type in ["llm", "asr", "storage"]:
-            service_names = ServiceRegistry.list_services(service_type)
-            for name in service_names:
-                task = cls.check_service(service_type, name)
-                tasks.append(task)
-
-        # 并发执行所有检查
-        await asyncio.gather(*tasks, return_exceptions=True)
+        # 只遍历有已注册服务的类型
+        targets = sorted(
+            (service_type, name)
+            for service_type in ServiceRegistry.registered_types()
+            for name in ServiceRegistry.list_services(service_type)
+        )
+
+        async with AsyncExitStack() as stack:
+            for service_type, name in targets:
+                await stack.enter_async_context(cls._probe_lock(service_type, name))
+
+            with cls._all_locks():
+                pending = [
+                    result
+                    for result, needs_probe in (cls._begin_check(st, name, force=False) for st, name in targets)
+                    if needs_probe
+                ]
+
+            try:
+                # 并发执行所有检查
+                outcomes = await asyncio.gather(
+                    *(cls._probe(result.service_type, result.service_name) for result in pending),
+                    return_exceptions=True,
+                )
+            except asyncio.CancelledError:
+                cls._abort_checks(pending)
+                raise
+
+            with cls._all_locks():
+                for result, outcome in zip(pending, outcomes, strict=True):
+                    if isinstance(outcome, BaseException):
+                        # 单个探测被取消（gather 以异常形式返回）：退回 UNKNOWN 以便重探
+                        if result.status is HealthStatus.CHECKING:
+                            result.status = HealthStatus.UNKNOWN
+                        continue
+                    cls._commit_check(result, outcome)
+                for service_type in {result.service_type for result in pending}:
+                    cls._publish_healthy(service_type)
 
         # 返回所有结果
-        with cls._lock:
-            return {service_type: dict(services) for service_type, services in cls._results.items()}
+        return cls.get_all_results()
 
     @classmethod
     def is_healthy(cls, service_type: str, name: str) -> bool:
@@ -336,12 +443,11 @@ class HealthChecker:
         Returns:
             True 如果健康，否则 False
         """
-        with cls._lock:
-            if name not in cls._results[service_type]:
+        with cls._type_lock(service_type):
+            result = cls._results.get(service_type, {}).get(name)
+            if result is None:
                 return True  # 未检查过，默认认为健康
-
-            result = cls._results[service_type][name]
-            return result.status == HealthStatus.HEALTHY
+            return result.status is HealthStatus.HEALTHY
 
     @classmethod
     def get_status(cls, service_type: str, name: str) -> HealthCheckResult | None:
@@ -354,18 +460,20 @@ class HealthChecker:
         Returns:
             健康检查结果，如果未检查过则返回 None
         """
-        with cls._lock:
-            return cls._results[service_type].get(name)
+        with cls._type_lock(service_type):
+            return cls._results.get(service_type, {}).get(name)
 
     @classmethod
-    def get_all_results(cls) -> dict[str, dict[str, HealthCheckResult]]:
+    def get_all_results(cls) -> dict[str, MappingProxyType[str, HealthCheckResult]]:
         """获取所有服务的健康检查结果
 
+        返回各类型结果字典的只读实时视图（不逐条复制）；需要稳定快照时由调用方自行 dict() 复制。
+
         Returns:
             所有服务的健康检查结果
         """
-        with cls._lock:
-            return {service_type: dict(services) for service_type, services in cls._results.items()}
+        with cls._all_locks():
+            return {service_type: MappingProxyType(services) for service_type, services in cls._results.items()}
 
     @classmethod
     def get_healthy_services(cls, service_type: str) -> list[str]:
@@ -381,10 +489,19 @@ class HealthChecker:
             healthy_llms = HealthChecker.get_healthy_services("llm")
             # 返回: ["doubao", "qwen"]
         """
-        with cls._lock:
-            return [
-                name for name, result in cls._results[service_type].items() if result.status == HealthStatus.HEALTHY
-            ]
+        return list(cls._healthy_snapshots.get(service_type, ()))
+
+    @classmethod
+    def healthy_snapshot(cls, service_type: str) -> tuple[str, ...]:
+        """无锁读取健康服务快照（不可变，只在健康状态变化时重建）
+
+        Args:
+            service_type: 服务类型
+
+        Returns:
+            健康服务名称元组
+        """
+        return cls._healthy_snapshots.get(service_type, ())
 
     @classmethod
     def get_unhealthy_services(cls, service_type: str) -> list[str]:
@@ -396,15 +513,18 @@ class HealthChecker:
         Returns:
             不健康服务名称列表
         """
-        with cls._lock:
+        with cls._type_lock(service_type):
             return [
-                name for name, result in cls._results[service_type].items() if result.status == HealthStatus.UNHEALTHY
+                name
+                for name, result in cls._results.get(service_type, {}).items()
+                if result.status is HealthStatus.UNHEALTHY
             ]
 
     @classmethod
     def clear(cls) -> None:
         """清空所有健康检查结果（主要用于测试）"""
-        with cls._lock:
+        with cls._all_locks():
             for service_type in cls._results:
                 cls._results[service_type].clear()
+            cls._healthy_snapshots.clear()
             logger.info("Cleared all health check results")
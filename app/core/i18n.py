@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import json
+import string
+from collections.abc import Callable, Mapping
 from pathlib import Path
 
 from app.i18n.codes import ErrorCode
@@ -9,21 +11,15 @@ _LOCALE_FILES: dict[str, Path] = {
     "zh": Path(__file__).resolve().parents[1] / "i18n" / "zh.json",
     "en": Path(__file__).resolve().parents[1] / "i18n" / "en.json",
 }
-_CACHE: dict[str, dict[int, str]] = {}
 
 
-def _load_locale_messages(locale: str) -> dict[int, str]:
-    if locale in _CACHE:
-        return _CACHE[locale]
-    path = _LOCALE_FILES.get(locale)
-    if path is None or not path.exists():
-        _CACHE[locale] = {}
-        return _CACHE[locale]
+def _parse_locale_file(path: Path) -> dict[int, str]:
+    if not path.exists():
+        return {}
     raw_text = path.read_text(encoding="utf-8")
     data: object = json.loads(raw_text)
     if not isinstance(data, dict):
-        _CACHE[locale] = {}
-        return _CACHE[locale]
+        return {}
     normalized: dict[int, str] = {}
     for key, value in data.items():
         if not isinstance(key, str) or not isinstance(value, str):
@@ -31,19 +27,59 @@ def _load_locale_messages(locale: str) -> dict[int, str]:
         if not key.isdigit():
             continue
         normalized[int(key)] = value
-    _CACHE[locale] = normalized
     return normalized
 
 
+# 导入时一次性加载全部已知语言；未知 locale 直接回退中文，不写入缓存（避免任意请求头撑大字典）
+_CACHE: dict[str, dict[int, str]] = {locale: _parse_locale_file(path) for locale, path in _LOCALE_FILES.items()}
+_DEFAULT_MESSAGES = _CACHE["zh"]
+
+_FORMATTER = string.Formatter()
+
+
+def _compile_template(template: str) -> Callable[[Mapping[str, str]], str] | None:
+    """把只含简单 {name} 占位符的模板预解析为渲染函数；含格式说明/转换/属性访问时返回 None（交给 format_map）"""
+    try:
+        parsed = list(_FORMATTER.parse(template))
+    except ValueError:
+        return None
+    segments: list[tuple[str, str | None]] = []
+    for literal, field_name, format_spec, conversion in parsed:
+        if field_name is not None and (format_spec or conversion or not field_name.isidentifier()):
+            return None
+        segments.append((literal, field_name))
+    frozen_segments = tuple(segments)
+
+    def render(values: Mapping[str, str]) -> str:
+        parts: list[str] = []
+        for literal, field_name in frozen_segments:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(format(values[field_name]))
+        return "".join(parts)
+
+    return render
+
+
+# 带占位符的模板在导入时预解析，get_message 渲染时不再逐次解析格式串
+_COMPILED: dict[str, dict[int, Callable[[Mapping[str, str]], str] | None]] = {
+    locale: {code: _compile_template(template) for code, template in messages.items() if "{" in template}
+    for locale, messages in _CACHE.items()
+}
+
+
 def get_message(code: ErrorCode, locale: str, **kwargs: str) -> str:
-    messages = _load_locale_messages(locale)
-    template = messages.get(code.value)
+    if locale not in _CACHE:
+        locale = "zh"
+    template = _CACHE[locale].get(code.value)
     if template is None:
-        fallback = _load_locale_messages("zh")
-        template = fallback.get(code.value, "未知错误")
-    if not kwargs:
+        locale = "zh"
+        template = _DEFAULT_MESSAGES.get(code.value, "未知错误")
+    # 无参数或模板无占位符（大多数固定文案）时直接返回，跳过 format_map 与异常处理
+    if not kwargs or "{" not in template:
         return template
+    render = _COMPILED[locale].get(code.value)
     try:
-        return template.format_map(kwargs)
+        return render(kwargs) if render is not None else template.format_map(kwargs)
     except KeyError:
         return template
@@ -5,7 +5,9 @@
 
 from __future__ import annotations
 
+import itertools
 import logging
+import math
 import random
 import threading
 from abc import ABC, abstractmethod
@@ -85,7 +87,9 @@ class RoundRobinBalancer(LoadBalancer):
 
     def __init__(self, config: LoadBalancerConfig):
         super().__init__(config)
-        self._counters: dict[str, int] = {}
+        # 每个服务类型一个 itertools.count：next() 由 C 实现、在 GIL 下原子，热路径无需加锁
+        self._counters: dict[str, itertools.count[int]] = {}
+        # 仅用于首次创建计数器
         self._lock = threading.Lock()
 
     def select_service(
@@ -96,19 +100,37 @@ class RoundRobinBalancer(LoadBalancer):
         if not available_services:
             return None
 
-        with self._lock:
-            index = self._counters.get(service_type, 0)
-            selected = available_services[index % len(available_services)]
-            self._counters[service_type] = (index + 1) % len(available_services)
-            return selected
+        counter = self._counters.get(service_type)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(service_type, itertools.count())
+        # 取模容忍可用列表长度变化
+        return available_services[next(counter) % len(available_services)]
+
+
+@dataclass
+class _WeightedSchedule:
+    """某服务类型的交错加权轮询调度表（成员集合或注册表版本变化时重建）"""
+
+    members: list[str]
+    registry_version: int
+    slots: list[str]
+    cursor: itertools.count[int]
 
 
 class WeightedRoundRobinBalancer(LoadBalancer):
-    """加权轮询负载均衡器（平滑加权轮询）"""
+    """加权轮询负载均衡器（交错加权轮询，IWRR）
+
+    成员或权重变化时按权重（先约去最大公约数）预生成一轮交错调度表：第 r 轮依次放入
+    权重 >= r 的服务，使同一服务的选中尽量分散。选择时只推进游标取模，O(1) 且不分配内存。
+    """
 
     def __init__(self, config: LoadBalancerConfig):
         super().__init__(config)
-        self._current_weights: dict[str, dict[str, int]] = {}
+        self._schedules: dict[str, _WeightedSchedule] = {}
+        # (service_type, service_name) -> (注册表版本, 权重)；健康抖动引起的重建不再回查注册表
+        self._weight_cache: dict[tuple[str, str], tuple[int, int]] = {}
+        # 仅在重建调度表时加锁
         self._lock = threading.Lock()
 
     def select_service(
@@ -119,37 +141,50 @@ class WeightedRoundRobinBalancer(LoadBalancer):
         if not available_services:
             return None
 
-        with self._lock:
-            if service_type not in self._current_weights:
-                self._current_weights[service_type] = {}
-
-            weights = self._current_weights[service_type]
-            total_weight = 0
-            selected = None
-            selected_weight = None
-
-            for name in available_services:
-                weight = self._get_weight(service_type, name)
-                total_weight += weight
-                weights[name] = weights.get(name, 0) + weight
-
-                if selected is None or weights[name] > selected_weight:
-                    selected = name
-                    selected_weight = weights[name]
-
-            if selected is None:
-                return None
+        schedule = self._schedules.get(service_type)
+        version = ServiceRegistry.version()
+        if schedule is None or schedule.registry_version != version or schedule.members != available_services:
+            with self._lock:
+                schedule = self._build_schedule(service_type, available_services, version)
+                self._schedules[service_type] = schedule
 
-            weights[selected] -= total_weight
-            for name in list(weights.keys()):
-                if name not in available_services:
-                    weights.pop(name, None)
+        slots = schedule.slots
+        return slots[next(schedule.cursor) % len(slots)]
 
-            return selected
+    def _build_schedule(
+        self,
+        service_type: str,
+        available_services: list[str],
+        registry_version: int,
+    ) -> _WeightedSchedule:
+        weights = [self._get_weight(service_type, name, registry_version) for name in available_services]
+        divisor = math.gcd(*weights)
+        reduced = [weight // divisor for weight in weights]
+        slots = [
+            name
+            for round_index in range(1, max(reduced) + 1)
+            for name, weight in zip(available_services, reduced, strict=True)
+            if weight >= round_index
+        ]
+        return _WeightedSchedule(
+            members=list(available_services),
+            registry_version=registry_version,
+            slots=slots,
+            cursor=itertools.count(),
+        )
+
+    def _get_weight(self, service_type: str, service_name: str, registry_version: int | None = None) -> int:
+        if registry_version is None:
+            registry_version = ServiceRegistry.version()
+        key = (service_type, service_name)
+        cached = self._weight_cache.get(key)
+        if cached is not None and cached[0] == registry_version:
+            return cached[1]
 
-    def _get_weight(self, service_type: str, service_name: str) -> int:
         metadata = ServiceRegistry.get_metadata(service_type, service_name)
-        return self._weight_from_metadata(metadata)
+        weight = self._weight_from_metadata(metadata)
+        self._weight_cache[key] = (registry_version, weight)
+        return weight
 
     @staticmethod
     def _weight_from_metadata(metadata: ServiceMetadata) -> int:
@@ -171,33 +206,50 @@ class RandomBalancer(LoadBalancer):
 
 
 class ConnectionTracker:
-    """连接数跟踪器"""
+    """连接数跟踪器
+
+    计数按 (service_type, service_name) 哈希分到 _SHARD_COUNT 个分片，各分片独立加锁，
+    不同服务的请求开始/结束互不争用同一把锁。
+    """
+
+    _SHARD_COUNT = 16  # 必须为 2 的幂
 
     def __init__(self) -> None:
-        self._connections: dict[str, dict[str, int]] = {}
-        self._lock = threading.Lock()
+        self._shards: tuple[tuple[threading.Lock, dict[tuple[str, str], int]], ...] = tuple(
+            (threading.Lock(), {}) for _ in range(self._SHARD_COUNT)
+        )
+
+    def _shard(self, key: tuple[str, str]) -> tuple[threading.Lock, dict[tuple[str, str], int]]:
+        return self._shards[hash(key) & (self._SHARD_COUNT - 1)]
 
     def increment(self, service_type: str, service_name: str) -> None:
-        with self._lock:
-            if service_type not in self._connections:
-                self._connections[service_type] = {}
-            current = self._connections[service_type].get(service_name, 0)
-            self._connections[service_type][service_name] = current + 1
+        key = (service_type, service_name)
+        lock, counts = self._shard(key)
+        with lock:
+            counts[key] = counts.get(key, 0) + 1
 
     def decrement(self, service_type: str, service_name: str) -> None:
-        with self._lock:
-            if service_type not in self._connections:
+        key = (service_type, service_name)
+        lock, counts = self._shard(key)
+        with lock:
+            current = counts.get(key)
+            if current is None:
                 return
-            current = self._connections[service_type].get(service_name, 0)
-            self._connections[service_type][service_name] = max(0, current - 1)
+            counts[key] = max(0, current - 1)
 
     def get_count(self, service_type: str, service_name: str) -> int:
-        with self._lock:
-            return self._connections.get(service_type, {}).get(service_name, 0)
+        key = (service_type, service_name)
+        # 单次 dict 读取在 GIL 下原子，读路径无需加锁
+        return self._shard(key)[1].get(key, 0)
 
     def get_all_counts(self, service_type: str) -> dict[str, int]:
-        with self._lock:
-            return dict(self._connections.get(service_type, {}))
+        result: dict[str, int] = {}
+        for lock, counts in self._shards:
+            with lock:
+                for (svc_type, service_name), count in counts.items():
+                    if svc_type == service_type:
+                        result[service_name] = count
+        return result
 
 
 class LeastConnectionsBalancer(LoadBalancer):
@@ -215,9 +267,20 @@ class LeastConnectionsBalancer(LoadBalancer):
         if not available_services:
             return None
 
-        counts = {name: self.tracker.get_count(service_type, name) for name in available_services}
-        min_count = min(counts.values())
-        candidates = [name for name, count in counts.items() if count == min_count]
+        # 单次遍历求最小连接数及并列候选；get_count 为无锁读取
+        get_count = self.tracker.get_count
+        min_count = -1
+        candidates: list[str] = []
+        for name in available_services:
+            count = get_count(service_type, name)
+            if min_count < 0 or count < min_count:
+                min_count = count
+                candidates = [name]
+            elif count == min_count:
+                candidates.append(name)
+
+        if len(candidates) == 1:
+            return candidates[0]
         return random.choice(candidates)  # nosec B311
 
     @asynccontextmanager
@@ -230,6 +293,14 @@ class LeastConnectionsBalancer(LoadBalancer):
             self.tracker.decrement(service_type, service_name)
 
 
+_BALANCER_CLASSES: dict[BalancingStrategy, type[LoadBalancer]] = {
+    BalancingStrategy.ROUND_ROBIN: RoundRobinBalancer,
+    BalancingStrategy.WEIGHTED_ROUND_ROBIN: WeightedRoundRobinBalancer,
+    BalancingStrategy.RANDOM: RandomBalancer,
+    BalancingStrategy.LEAST_CONNECTIONS: LeastConnectionsBalancer,
+}
+
+
 class LoadBalancerFactory:
     """负载均衡器工厂"""
 
@@ -242,22 +313,18 @@ class LoadBalancerFactory:
         strategy: BalancingStrategy,
         config: LoadBalancerConfig | None = None,
     ) -> LoadBalancer:
-        if strategy not in cls._instances:
-            with cls._lock:
-                if strategy not in cls._instances:
-                    if config is None:
-                        config = LoadBalancerConfig(strategy=strategy)
-
-                    balancer_map: dict[BalancingStrategy, type[LoadBalancer]] = {
-                        BalancingStrategy.ROUND_ROBIN: RoundRobinBalancer,
-                        BalancingStrategy.WEIGHTED_ROUND_ROBIN: WeightedRoundRobinBalancer,
-                        BalancingStrategy.RANDOM: RandomBalancer,
-                        BalancingStrategy.LEAST_CONNECTIONS: LeastConnectionsBalancer,
-                    }
-                    balancer_cls = balancer_map[strategy]
-                    cls._instances[strategy] = balancer_cls(config)  # type: ignore[abstract]
-
-        return cls._instances[strategy]
+        balancer = cls._instances.get(strategy)
+        if balancer is not None:
+            return balancer
+
+        with cls._lock:
+            balancer = cls._instances.get(strategy)
+            if balancer is None:
+                if config is None:
+                    config = LoadBalancerConfig(strategy=strategy)
+                balancer_cls = _BALANCER_CLASSES[strategy]
+                balancer = cls._instances[strategy] = balancer_cls(config)  # type: ignore[abstract]
+        return balancer
 
     @classmethod
     def get_default(cls) -> LoadBalancer:
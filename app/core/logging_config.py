@@ -27,7 +27,7 @@ _TRACE_FORMAT = "%(asctime)s %(levelname)s %(name)s trace_id=%(trace_id)s %(mess
 class TraceIdFilter(logging.Filter):
     """把当前 trace_id 注入每条 LogRecord。
 
-    get_request_id() 在 contextvar 为空时回落到新的 uuid hex,故 record.trace_id 恒有值,
+    get_request_id() 在 contextvar 为空时回落到新的 32 位 hex,故 record.trace_id 恒有值,
     引用 %(trace_id)s 的 Formatter 永远不会 KeyError。
     """
 
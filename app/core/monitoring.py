@@ -10,8 +10,10 @@ multiprocess + worker exporter 是独立基础设施任务)。
 
 from __future__ import annotations
 
+import bisect
 import inspect
 import logging
+import math
 import threading
 import time
 from collections import deque
@@ -20,8 +22,13 @@ from datetime import datetime
 from enum import StrEnum
 from functools import wraps
 
+from app.config import settings
+
 logger = logging.getLogger("app.core.monitoring")
 
+# 每隔多少次记录用 fsum 重算一次滑动窗口累加和，校正增量加减的浮点漂移
+_WINDOW_SUM_RESYNC_INTERVAL = 32
+
 
 class MetricType(StrEnum):
     """指标类型"""
@@ -68,8 +75,9 @@ class ServiceMetrics:
     max_response_time: float = 0.0
     p95_response_time: float = 0.0
     p99_response_time: float = 0.0
-    window_start: datetime = field(default_factory=datetime.now)
-    last_update: datetime = field(default_factory=datetime.now)
+    # Unix 时间戳（time.time()）：热路径避免 datetime.now() 的构造开销，展示时再转换
+    window_start: float = field(default_factory=time.time)
+    last_update: float = field(default_factory=time.time)
 
     @property
     def error_rate(self) -> float:
@@ -81,18 +89,40 @@ class ServiceMetrics:
     def success_rate(self) -> float:
         return 1.0 - self.error_rate
 
-    def update_response_time(self, duration: float, enable_percentiles: bool = True) -> None:
-        self.response_times.append(duration)
-        if not self.response_times:
-            return
+    @property
+    def window_start_at(self) -> datetime:
+        return datetime.fromtimestamp(self.window_start)
 
-        sorted_times = sorted(self.response_times)
-        self.avg_response_time = sum(sorted_times) / len(sorted_times)
-        self.max_response_time = sorted_times[-1]
+    @property
+    def last_update_at(self) -> datetime:
+        return datetime.fromtimestamp(self.last_update)
+
+    # 滑动窗口的增量统计状态：累加和、与 response_times 同内容的有序副本、记录次数。
+    # 有序副本用 bisect 维护（插入/淘汰各一次二分 + C 层 memmove），最大值与分位数直接按下标读取
+    _window_sum: float = field(default=0.0, init=False, repr=False)
+    _sorted_window: list[float] = field(default_factory=list, init=False, repr=False)
+    _updates: int = field(default=0, init=False, repr=False)
 
-        if enable_percentiles and len(sorted_times) >= 20:
-            self.p95_response_time = _percentile(sorted_times, 0.95)
-            self.p99_response_time = _percentile(sorted_times, 0.99)
+    def update_response_time(self, duration: float, enable_percentiles: bool = True) -> None:
+        window = self.response_times
+        ordered = self._sorted_window
+        if window.maxlen is not None and len(window) == window.maxlen:
+            evicted = window[0]
+            self._window_sum -= evicted
+            del ordered[bisect.bisect_left(ordered, evicted)]
+        window.append(duration)
+        bisect.insort(ordered, duration)
+        self._window_sum += duration
+        self._updates += 1
+        if self._updates % _WINDOW_SUM_RESYNC_INTERVAL == 0:
+            self._window_sum = math.fsum(ordered)
+
+        self.avg_response_time = self._window_sum / len(ordered)
+        self.max_response_time = ordered[-1]
+
+        if enable_percentiles and len(ordered) >= 20:
+            self.p95_response_time = _percentile(ordered, 0.95)
+            self.p99_response_time = _percentile(ordered, 0.99)
 
 
 def _percentile(sorted_values: list[float], percentile: float) -> float:
@@ -104,12 +134,22 @@ def _percentile(sorted_values: list[float], percentile: float) -> float:
 
 
 class MetricsCollector:
-    """指标收集器（线程安全）"""
+    """指标收集器（线程安全）
+
+    指标按 "service_type:service_name" 哈希分到 _SHARD_COUNT 个分片，各分片独立加锁，
+    不同服务的调用记录互不争用同一把锁。
+    """
+
+    _SHARD_COUNT = 16  # 必须为 2 的幂
 
     def __init__(self, config: MonitoringConfig):
         self.config = config
-        self._metrics: dict[str, ServiceMetrics] = {}
-        self._lock = threading.Lock()
+        self._shards: tuple[tuple[threading.Lock, dict[str, ServiceMetrics]], ...] = tuple(
+            (threading.Lock(), {}) for _ in range(self._SHARD_COUNT)
+        )
+
+    def _shard(self, key: str) -> tuple[threading.Lock, dict[str, ServiceMetrics]]:
+        return self._shards[hash(key) & (self._SHARD_COUNT - 1)]
 
     def record_call(
         self,
@@ -119,14 +159,15 @@ class MetricsCollector:
         duration: float,
     ) -> None:
         key = f"{service_type}:{service_name}"
-        with self._lock:
-            if key not in self._metrics:
-                self._metrics[key] = ServiceMetrics(
+        lock, metrics_by_key = self._shard(key)
+        with lock:
+            metrics = metrics_by_key.get(key)
+            if metrics is None:
+                metrics = metrics_by_key[key] = ServiceMetrics(
                     service_type=service_type,
                     service_name=service_name,
                 )
 
-            metrics = self._metrics[key]
             metrics.total_calls += 1
             if success:
                 metrics.success_calls += 1
@@ -134,32 +175,50 @@ class MetricsCollector:
                 metrics.failed_calls += 1
 
             metrics.update_response_time(duration, self.config.enable_percentiles)
-            metrics.last_update = datetime.now()
+            metrics.last_update = time.time()
 
     def get_metrics(self, service_type: str, service_name: str) -> ServiceMetrics | None:
         key = f"{service_type}:{service_name}"
-        with self._lock:
-            return self._metrics.get(key)
+        lock, metrics_by_key = self._shard(key)
+        with lock:
+            return metrics_by_key.get(key)
 
     def get_all_metrics(self) -> dict[str, ServiceMetrics]:
-        with self._lock:
-            return dict(self._metrics)
+        result: dict[str, ServiceMetrics] = {}
+        for lock, metrics_by_key in self._shards:
+            with lock:
+                result.update(metrics_by_key)
+        return result
 
     def reset_metrics(self, service_type: str, service_name: str) -> None:
         key = f"{service_type}:{service_name}"
-        with self._lock:
-            self._metrics.pop(key, None)
+        lock, metrics_by_key = self._shard(key)
+        with lock:
+            metrics_by_key.pop(key, None)
 
 
 def monitor(service_type: str, service_name: str):
-    """监控装饰器：自动收集调用指标"""
+    """监控装饰器：自动收集调用指标
+
+    settings.MONITORING_ENABLED 为 False 时在装饰时直接返回原函数，不留任何包装开销；
+    运行期仍可通过 MonitoringConfig.enabled 临时关闭收集。
+    """
 
     def decorator(func):
+        if not settings.MONITORING_ENABLED:
+            return func
+
+        # 首次调用时绑定单例，之后每次调用只读闭包变量，不再走 get_instance 的双重检查
+        bound: MonitoringSystem | None = None
+
         if inspect.isasyncgenfunction(func):
 
             @wraps(func)
             async def asyncgen_wrapper(*args, **kwargs):
-                monitoring = MonitoringSystem.get_instance()
+                nonlocal bound
+                monitoring = bound
+                if monitoring is None:
+                    monitoring = bound = MonitoringSystem.get_instance()
                 if not monitoring.config.enabled:
                     async for item in func(*args, **kwargs):
                         yield item
@@ -186,7 +245,10 @@ def monitor(service_type: str, service_name: str):
 
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
-                monitoring = MonitoringSystem.get_instance()
+                nonlocal bound
+                monitoring = bound
+                if monitoring is None:
+                    monitoring = bound = MonitoringSystem.get_instance()
                 if not monitoring.config.enabled:
                     return await func(*args, **kwargs)
 
@@ -209,7 +271,10 @@ def monitor(service_type: str, service_name: str):
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            monitoring = MonitoringSystem.get_instance()
+            nonlocal bound
+            monitoring = bound
+            if monitoring is None:
+                monitoring = bound = MonitoringSystem.get_instance()
             if not monitoring.config.enabled:
                 return func(*args, **kwargs)
 
@@ -254,11 +319,13 @@ class MonitoringSystem:
 
     @classmethod
     def get_instance(cls, config: MonitoringConfig | None = None) -> MonitoringSystem:
-        if cls._instance is None:
+        instance = cls._instance
+        if instance is None:
             with cls._lock:
-                if cls._instance is None:
-                    cls._instance = cls(config)
-        return cls._instance
+                instance = cls._instance
+                if instance is None:
+                    instance = cls._instance = cls(config)
+        return instance
 
     def start(self) -> None:
         """无操作 seam（历史上启动告警 daemon 循环;现已拆除,告警走 Kuma/Feishu）。"""
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import threading
+
 from redis.asyncio import Redis
 
 from app.config import settings
 
 _redis_client: Redis | None = None
+# 仅在首次创建客户端时加锁（双重检查），命中路径只读一次全局变量
+_redis_client_lock = threading.Lock()
 
 
 def _get_redis_url() -> str:
@@ -16,9 +20,13 @@ def _get_redis_url() -> str:
 
 def get_redis_client() -> Redis:
     global _redis_client
-    if _redis_client is None:
-        _redis_client = Redis.from_url(_get_redis_url(), decode_responses=True)
-    return _redis_client
+    client = _redis_client
+    if client is None:
+        with _redis_client_lock:
+            client = _redis_client
+            if client is None:
+                client = _redis_client = Redis.from_url(_get_redis_url(), decode_responses=True)
+    return client
 
 
 async def publish_message(channel: str, message: str) -> None:
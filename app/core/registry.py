@@ -16,14 +16,25 @@
 
 from __future__ import annotations
 
+import inspect
 import logging
 from collections.abc import Callable
 from dataclasses import dataclass
+from functools import lru_cache
 from threading import Lock
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# 实例化时可按需注入的构造参数
+_INJECTABLE_INIT_PARAMS = frozenset({"model_id", "config", "user_id"})
+
+
+@lru_cache(maxsize=256)
+def _injectable_params(service_class: type[Any]) -> frozenset[str]:
+    """服务类 __init__ 接受的可注入参数（按类缓存，inspect.signature 每个类只解析一次）"""
+    return _INJECTABLE_INIT_PARAMS.intersection(inspect.signature(service_class.__init__).parameters)
+
 
 @dataclass
 class ServiceMetadata:
@@ -71,6 +82,15 @@ class ServiceMetadata:
             self.display_name = self.name.capitalize()
 
 
+@dataclass(slots=True)
+class _ServiceEntry:
+    """注册表条目：服务类、元数据与缓存的单例（首次 get 时原地填充）"""
+
+    service_class: type[Any]
+    metadata: ServiceMetadata
+    instance: Any | None = None
+
+
 class ServiceRegistry:
     """服务注册中心
 
@@ -79,13 +99,16 @@ class ServiceRegistry:
     内部结构：
         _services: {
             "llm": {
-                "doubao": (DoubaoLLMService, metadata, instance),
-                "qwen": (QwenLLMService, metadata, instance),
+                "doubao": _ServiceEntry(DoubaoLLMService, metadata, instance),
+                "qwen": _ServiceEntry(QwenLLMService, metadata, instance),
             },
             "asr": {...},
             "storage": {...},
         }
 
+    内层字典写时复制：register/clear 在锁内构建新字典并整体替换，从不原地修改已发布的字典，
+    读方取到引用后可免锁遍历。
+
     使用示例：
         # 注册服务
         ServiceRegistry.register("llm", "doubao", DoubaoLLMService, metadata)
@@ -98,8 +121,8 @@ class ServiceRegistry:
     """
 
     # 类变量：存储所有已注册的服务
-    # 格式: {service_type: {name: (service_class, metadata, instance)}}
-    _services: dict[str, dict[str, tuple[type[Any], ServiceMetadata, Any | None]]] = {
+    # 格式: {service_type: {name: _ServiceEntry(service_class, metadata, instance)}}
+    _services: dict[str, dict[str, _ServiceEntry]] = {
         "llm": {},
         "asr": {},
         "storage": {},
@@ -108,6 +131,12 @@ class ServiceRegistry:
     # 线程锁：确保注册和实例化过程线程安全
     _lock = Lock()
 
+    # 注册表版本号：register/clear 时递增，供调用方按版本失效基于元数据的缓存
+    _version = 0
+
+    # 服务名称元组缓存：{service_type: (name, ...)}，register/clear 时失效
+    _names_cache: dict[str, tuple[str, ...]] = {}
+
     @classmethod
     def register(
         cls,
@@ -143,11 +172,16 @@ class ServiceRegistry:
             metadata = ServiceMetadata(name=name, service_type=service_type)
 
         with cls._lock:
-            # 存储服务类、元数据和实例占位符（None）
-            cls._services[service_type][name] = (service_class, metadata, None)
+            # 存储服务类、元数据和实例占位符（None）；写时复制，发布新字典而不改动读方可能持有的旧字典
+            cls._services[service_type] = {**cls._services[service_type], name: _ServiceEntry(service_class, metadata)}
+            cls._names_cache.pop(service_type, None)
+            cls._version += 1
             logger.info(
-                f"Registered {service_type} service: {name} "
-                f"(class={service_class.__name__}, priority={metadata.priority})"
+                "Registered %s service: %s (class=%s, priority=%s)",
+                service_type,
+                name,
+                service_class.__name__,
+                metadata.priority,
             )
 
     @classmethod
@@ -182,50 +216,58 @@ class ServiceRegistry:
             llm = ServiceRegistry.get("llm", "doubao")
             llm = ServiceRegistry.get("llm", "openrouter", model_id="openai/gpt-4o")
         """
-        if service_type not in cls._services:
+        services = cls._services.get(service_type)
+        if services is None:
             raise ValueError(f"Unsupported service_type: {service_type}")
 
-        if name not in cls._services[service_type]:
-            available = list(cls._services[service_type].keys())
+        entry = services.get(name)
+        if entry is None:
+            available = list(services.keys())
             raise ValueError(
                 f"Service '{name}' not registered for type '{service_type}'. Available services: {available}"
             )
 
-        with cls._lock:
-            service_class, metadata, cached_instance = cls._services[service_type][name]
+        # 如果提供了 model_id 或 config，总是创建新实例（不使用缓存）
+        # 因为不同的 model_id 或配置需要不同实例
+        if model_id or config is not None:
+            force_new = True
+
+        # 快路径：单例已创建时直接返回，不加锁（属性读取在 GIL 下原子）
+        if not force_new:
+            cached_instance = entry.instance
+            if cached_instance is not None:
+                return cached_instance
 
-            # 如果提供了 model_id 或 config，总是创建新实例（不使用缓存）
-            # 因为不同的 model_id 或配置需要不同实例
-            if model_id or config is not None:
-                force_new = True
+        with cls._lock:
+            # 加锁后从当前发布的桶重新读取：写时复制下锁外取到的 services 可能已被
+            # register/clear 替换，其他线程也可能已完成实例化
+            entry = cls._services.get(service_type, {}).get(name, entry)
+            service_class = entry.service_class
+            cached_instance = entry.instance
 
             # 如果强制创建新实例或没有缓存实例，则创建
             if force_new or cached_instance is None:
                 try:
                     # 尝试传入 model_id 参数（如果服务支持的话）
-                    import inspect
-
-                    sig = inspect.signature(service_class.__init__)
+                    accepted = _injectable_params(service_class)
                     kwargs: dict[str, Any] = {}
-                    if "model_id" in sig.parameters and model_id:
+                    if "model_id" in accepted and model_id:
                         kwargs["model_id"] = model_id
-                    if "config" in sig.parameters and config is not None:
+                    if "config" in accepted and config is not None:
                         kwargs["config"] = config
                     # 成本归因:仅当服务 __init__ 接受 user_id 时注入(ASR/image_service 不受影响)
-                    if "user_id" in sig.parameters and user_id:
+                    if "user_id" in accepted and user_id:
                         kwargs["user_id"] = user_id
                     instance = service_class(**kwargs)
 
                     # 如果不是强制创建，则缓存实例
                     if not force_new:
-                        cls._services[service_type][name] = (service_class, metadata, instance)
+                        entry.instance = instance
 
                     return instance
                 except Exception as exc:
-                    logger.error(
-                        f"Failed to instantiate {service_type} service '{name}': {exc}",
-                        exc_info=True,
-                    )
+                    # 原异常经 from exc 链接到 RuntimeError，堆栈交由上层处理器格式化，这里不重复输出
+                    logger.error("Failed to instantiate %s service '%s': %s", service_type, name, exc)
                     raise RuntimeError(f"Failed to instantiate {service_type} service '{name}': {exc}") from exc
 
             return cached_instance
@@ -247,10 +289,46 @@ class ServiceRegistry:
             llm_services = ServiceRegistry.list_services("llm")
             # 返回: ["doubao", "qwen"]
         """
+        return list(cls.service_names(service_type))
+
+    @classmethod
+    def service_names(cls, service_type: str) -> tuple[str, ...]:
+        """以不可变元组返回指定类型的已注册服务名称（缓存，仅遍历/成员判断的调用方使用）
+
+        Args:
+            service_type: 服务类型（"llm", "asr", "storage"）
+
+        Returns:
+            服务名称元组
+
+        Raises:
+            ValueError: 如果服务类型不支持
+        """
+        names = cls._names_cache.get(service_type)
+        if names is not None:
+            return names
+
         if service_type not in cls._services:
             raise ValueError(f"Unsupported service_type: {service_type}")
 
-        return list(cls._services[service_type].keys())
+        # 在锁内重建，避免与 register 的失效交错而写回过期结果
+        with cls._lock:
+            names = cls._names_cache[service_type] = tuple(cls._services[service_type])
+        return names
+
+    @classmethod
+    def version(cls) -> int:
+        """返回注册表版本号（注册或清空服务后变化）"""
+        return cls._version
+
+    @classmethod
+    def registered_types(cls) -> list[str]:
+        """列出至少注册了一个服务的服务类型
+
+        Returns:
+            服务类型列表（无已注册服务的类型不包含在内）
+        """
+        return [service_type for service_type, services in cls._services.items() if services]
 
     @classmethod
     def list_text_llm_providers(cls) -> list[str]:
@@ -263,9 +341,7 @@ class ServiceRegistry:
         Returns:
             支持文本生成的 LLM 服务名称列表
         """
-        return [
-            name for name, (_cls, metadata, _inst) in cls._services["llm"].items() if metadata.supports_text_generation
-        ]
+        return [name for name, entry in cls._services["llm"].items() if entry.metadata.supports_text_generation]
 
     @classmethod
     def get_metadata(cls, service_type: str, name: str) -> ServiceMetadata:
@@ -281,14 +357,13 @@ class ServiceRegistry:
         Raises:
             ValueError: 如果服务未注册
         """
-        if service_type not in cls._services:
-            raise ValueError(f"Unsupported service_type: {service_type}")
-
-        if name not in cls._services[service_type]:
-            raise ValueError(f"Service '{name}' not registered for type '{service_type}'")
-
-        _, metadata, _ = cls._services[service_type][name]
-        return metadata
+        # EAFP：命中路径每层只做一次哈希查找，未命中时再区分错误原因
+        try:
+            return cls._services[service_type][name].metadata
+        except KeyError:
+            if service_type not in cls._services:
+                raise ValueError(f"Unsupported service_type: {service_type}") from None
+            raise ValueError(f"Service '{name}' not registered for type '{service_type}'") from None
 
     @classmethod
     def is_registered(cls, service_type: str, name: str) -> bool:
@@ -301,7 +376,11 @@ class ServiceRegistry:
         Returns:
             True 如果已注册，否则 False
         """
-        return service_type in cls._services and name in cls._services[service_type]
+        try:
+            cls._services[service_type][name]
+        except KeyError:
+            return False
+        return True
 
     @classmethod
     def clear(cls, service_type: str | None = None) -> None:
@@ -311,13 +390,15 @@ class ServiceRegistry:
             service_type: 如果指定，只清空该类型的服务；否则清空所有
         """
         with cls._lock:
+            cls._version += 1
+            cls._names_cache.clear()
             if service_type:
                 if service_type in cls._services:
-                    cls._services[service_type].clear()
-                    logger.info(f"Cleared all {service_type} services")
+                    cls._services[service_type] = {}
+                    logger.info("Cleared all %s services", service_type)
             else:
                 for svc_type in cls._services:
-                    cls._services[svc_type].clear()
+                    cls._services[svc_type] = {}
                 logger.info("Cleared all services")
 
 
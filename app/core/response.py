@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+import os
 from contextvars import ContextVar, Token
 from typing import Optional
-from uuid import uuid4
 
 from fastapi.responses import JSONResponse
 
@@ -23,7 +23,8 @@ def get_request_id() -> str:
     trace_id = _request_id_ctx.get()
     if trace_id:
         return trace_id
-    return uuid4().hex
+    # 请求外（后台任务、启动期日志）回落为一次性 ID；与 RequestIDMiddleware 相同格式，免去 UUID 对象构造
+    return os.urandom(16).hex()
 
 
 def _build_response(
@@ -37,6 +37,8 @@ USER_REVOKED_PREFIX = "revoked_user:"
 #   * verified with the algorithm HARD-PINNED to HS256 -- never widened, never
 #     read from config -- which closes the classic RS256<->HS256 confusion.
 _SCOPED_ALG = "HS256"
+# 验签算法白名单：模块级常量，避免每次 decode 新建单元素列表
+_SCOPED_ALGORITHMS = (_SCOPED_ALG,)
 _SCOPED_TYP = "scoped-ticket"
 _SCOPED_ISS = "aaa-web"
 
@@ -50,7 +52,8 @@ def issue_scoped_token(*, sub: str, scope: str, ttl: int, resource: dict[str, An
     ``resource`` (e.g. ``{"task_id": ..., "summary_type": ...}``) further pins
     the ticket to a single resource for SSE streams.
     """
-    if not settings.JWT_SECRET:
+    secret = settings.JWT_SECRET
+    if not secret:
         raise BusinessError(ErrorCode.INTERNAL_SERVER_ERROR)
     now = int(time.time())
     claims: dict[str, Any] = {
@@ -63,7 +66,7 @@ def issue_scoped_token(*, sub: str, scope: str, ttl: int, resource: dict[str, An
     }
     if resource:
         claims["resource"] = resource
-    return jwt.encode(claims, settings.JWT_SECRET, algorithm=_SCOPED_ALG)
+    return jwt.encode(claims, secret, algorithm=_SCOPED_ALG)
 
 
 def verify_scoped_token(token: str) -> dict[str, Any]:
@@ -75,13 +78,15 @@ def verify_scoped_token(token: str) -> dict[str, Any]:
     """
     if not token:
         raise BusinessError(ErrorCode.AUTH_TOKEN_NOT_PROVIDED)
-    if not settings.JWT_SECRET:
+    # 每次调用只读一次 settings（pydantic 属性访问）；不做进程级缓存，密钥轮换/测试覆盖即时生效
+    secret = settings.JWT_SECRET
+    if not secret:
         raise BusinessError(ErrorCode.AUTH_TOKEN_INVALID)
     try:
         claims: dict[str, Any] = jwt.decode(
             token,
-            settings.JWT_SECRET,
-            algorithms=[_SCOPED_ALG],
+            secret,
+            algorithms=_SCOPED_ALGORITHMS,
         )
     except ExpiredSignatureError as exc:
         raise BusinessError(ErrorCode.AUTH_TOKEN_EXPIRED) from exc
@@ -7,9 +7,9 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import threading
 import time
-from collections.abc import Callable
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
 from enum import StrEnum
 from typing import Any
 
@@ -30,6 +30,21 @@ from app.core.user_context import get_current_user_id
 
 logger = logging.getLogger(__name__)
 
+# 候选（健康）服务列表的进程内缓存有效期（秒）；注册表或健康快照变化时提前失效
+_HEALTHY_CACHE_TTL_SECONDS = 1.0
+# 成本分缓存条目上限（按 服务类型/注册表版本/候选服务/请求参数 记忆归一化后的成本分）
+_COST_SCORE_CACHE_MAX = 256
+
+
+def _argmax(scores: dict[str, float]) -> str | None:
+    """单次遍历取最高分的服务名（并列取先出现者，与 max(scores, key=scores.get) 一致）"""
+    best_name: str | None = None
+    best_score = 0.0
+    for name, score in scores.items():
+        if best_name is None or score > best_score:
+            best_name, best_score = name, score
+    return best_name
+
 
 class SelectionStrategy(StrEnum):
     """Service selection strategy."""
@@ -63,21 +78,21 @@ class SmartFactoryConfig(BaseModel):
 class SmartFactory:
     """Smart service factory."""
 
-    _instance: SmartFactory | None = None
-    _lock = threading.Lock()
+    # 模块导入时即以默认配置创建（见文件末尾）；configure()/reset() 整体替换，请求路径无需判空加锁
+    _instance: SmartFactory
 
     def __init__(self, config: SmartFactoryConfig | None = None):
         self._config = config or SmartFactoryConfig()
         self._load_balancer: LoadBalancer | None = None
         self._cost_optimizer: CostOptimizer | None = None
-        self._service_cache: dict[str, dict[str, tuple[Any, float]]] = {}
+        # (service_type, cache_key) -> (服务实例, 缓存时刻)
+        self._service_cache: dict[tuple[str, str], tuple[Any, float]] = {}
+        # service_type -> (候选服务, 过期时刻 monotonic, 注册表版本, 健康快照)
+        self._healthy_cache: dict[str, tuple[list[str], float, int, tuple[str, ...]]] = {}
+        self._cost_score_cache: OrderedDict[Hashable, dict[str, float]] = OrderedDict()
 
     @classmethod
-    def get_instance(cls, config: SmartFactoryConfig | None = None) -> SmartFactory:
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = cls(config)
+    def get_instance(cls) -> SmartFactory:
         return cls._instance
 
     @classmethod
@@ -92,7 +107,7 @@ class SmartFactory:
         request_params: dict[str, Any] | None = None,
         custom_scorer: Callable[[Any, ServiceMetadata], float] | None = None,
     ) -> Any:
-        instance = cls.get_instance()
+        instance = cls._instance
 
         if user_id is None:
             user_id = get_current_user_id()
@@ -122,9 +137,44 @@ class SmartFactory:
         request_params: dict[str, Any] | None,
         custom_scorer: Callable[[Any, ServiceMetadata], float] | None,
     ) -> str | None:
+        healthy_services = await self._get_candidate_services(service_type)
+        if not healthy_services:
+            return None
+
+        if strategy == SelectionStrategy.HEALTH_FIRST:
+            return self._select_by_health(service_type, healthy_services)
+        if strategy == SelectionStrategy.COST_FIRST:
+            return self._select_by_cost(service_type, healthy_services, request_params)
+        if strategy == SelectionStrategy.PERFORMANCE_FIRST:
+            return self._select_by_performance(service_type, healthy_services)
+        if strategy == SelectionStrategy.BALANCED:
+            return self._select_balanced(service_type, healthy_services, request_params)
+        if strategy == SelectionStrategy.CUSTOM:
+            if not custom_scorer:
+                raise ValueError("Custom strategy requires custom_scorer function")
+            return self._select_custom(service_type, healthy_services, custom_scorer)
+
+        return healthy_services[0] if healthy_services else None
+
+    async def _get_candidate_services(self, service_type: str) -> list[str]:
+        """返回可参与选择的服务（优先健康服务），结果短时缓存
+
+        稳态下同一类型的候选列表在极短时间内不会变化；缓存命中时跳过注册表扫描与探测 fan-out。
+        注册表版本或 HealthChecker 健康快照（状态变化时整体替换）一旦变化立即失效。
+        """
+        version = ServiceRegistry.version()
+        cached = self._healthy_cache.get(service_type)
+        if (
+            cached is not None
+            and time.monotonic() < cached[1]
+            and cached[2] == version
+            and cached[3] is HealthChecker.healthy_snapshot(service_type)
+        ):
+            return cached[0]
+
         all_services = ServiceRegistry.list_services(service_type)
         if not all_services:
-            return None
+            return []
 
         # 主动健康探测（尊重 HealthChecker 的 30s 缓存；缓存内为 no-op，不会每次选择都打满探测）：
         # - 稳态（已有健康服务）时，并发重探所有「非 HEALTHY」服务（UNHEALTHY / CHECKING / UNKNOWN），
@@ -152,20 +202,13 @@ class SmartFactory:
             )
             healthy_services = all_services
 
-        if strategy == SelectionStrategy.HEALTH_FIRST:
-            return self._select_by_health(service_type, healthy_services)
-        if strategy == SelectionStrategy.COST_FIRST:
-            return self._select_by_cost(service_type, healthy_services, request_params)
-        if strategy == SelectionStrategy.PERFORMANCE_FIRST:
-            return self._select_by_performance(service_type, healthy_services)
-        if strategy == SelectionStrategy.BALANCED:
-            return self._select_balanced(service_type, healthy_services, request_params)
-        if strategy == SelectionStrategy.CUSTOM:
-            if not custom_scorer:
-                raise ValueError("Custom strategy requires custom_scorer function")
-            return self._select_custom(service_type, healthy_services, custom_scorer)
-
-        return healthy_services[0] if healthy_services else None
+        self._healthy_cache[service_type] = (
+            healthy_services,
+            time.monotonic() + _HEALTHY_CACHE_TTL_SECONDS,
+            version,
+            HealthChecker.healthy_snapshot(service_type),
+        )
+        return healthy_services
 
     def _select_by_health(self, service_type: str, healthy_services: list[str]) -> str | None:
         if not self._load_balancer:
@@ -201,13 +244,15 @@ class SmartFactory:
         service_type: str,
         healthy_services: list[str],
     ) -> str | None:
-        services_with_priority = []
-        for name in healthy_services:
+        if not healthy_services:
+            return None
+
+        def _priority(name: str) -> int:
             metadata = ServiceRegistry.get_metadata(service_type, name)
-            services_with_priority.append((name, metadata.priority if metadata else 100))
+            return metadata.priority if metadata else 100
 
-        services_with_priority.sort(key=lambda item: item[1])
-        return services_with_priority[0][0] if services_with_priority else None
+        # 单次遍历取最小优先级；并列时取先出现者，与原稳定排序取首项一致
+        return min(healthy_services, key=_priority)
 
     def _select_balanced(
         self,
@@ -216,6 +261,10 @@ class SmartFactory:
         request_params: dict[str, Any] | None,
     ) -> str | None:
         weights = self._config.balanced_weights
+        # 权重在循环外取一次，避免每个候选重复三次字典查找
+        w_health = weights.get("health", 0.4)
+        w_cost = weights.get("cost", 0.3)
+        w_performance = weights.get("performance", 0.3)
         cost_scores = self._calculate_cost_scores(service_type, healthy_services, request_params)
         scores: dict[str, float] = {}
 
@@ -225,14 +274,10 @@ class SmartFactory:
             priority = metadata.priority if metadata else 50
             performance_score = max(0.0, 1.0 - min(priority / 100.0, 1.0))
             cost_score = cost_scores.get(name, 0.5)
-            total_score = (
-                health_score * weights.get("health", 0.4)
-                + cost_score * weights.get("cost", 0.3)
-                + performance_score * weights.get("performance", 0.3)
-            )
+            total_score = health_score * w_health + cost_score * w_cost + performance_score * w_performance
             scores[name] = total_score
 
-        return max(scores, key=scores.get) if scores else None
+        return _argmax(scores)
 
     def _calculate_cost_scores(
         self,
@@ -243,6 +288,35 @@ class SmartFactory:
         if not request_params:
             return {name: 0.5 for name in healthy_services}
 
+        try:
+            key: Hashable | None = (
+                service_type,
+                ServiceRegistry.version(),
+                tuple(healthy_services),
+                frozenset(request_params.items()),
+            )
+            hash(key)
+        except TypeError:  # 参数含不可哈希值（如嵌套 dict）时不缓存
+            key = None
+        if key is not None:
+            cached = self._cost_score_cache.get(key)
+            if cached is not None:
+                self._cost_score_cache.move_to_end(key)
+                return cached
+
+        scores = self._compute_cost_scores(service_type, healthy_services, request_params)
+        if key is not None:
+            self._cost_score_cache[key] = scores
+            if len(self._cost_score_cache) > _COST_SCORE_CACHE_MAX:
+                self._cost_score_cache.popitem(last=False)
+        return scores
+
+    def _compute_cost_scores(
+        self,
+        service_type: str,
+        healthy_services: list[str],
+        request_params: dict[str, Any],
+    ) -> dict[str, float]:
         if not self._cost_optimizer:
             self._cost_optimizer = CostOptimizer(
                 CostOptimizerConfig(
@@ -259,17 +333,14 @@ class SmartFactory:
             )
             for name in healthy_services
         }
-        max_cost = max(costs.values()) if costs else 0.0
-        min_cost = min(costs.values()) if costs else 0.0
+        if len(costs) <= 1:
+            return dict.fromkeys(costs, 1.0)
 
-        scores: dict[str, float] = {}
-        for name, cost in costs.items():
-            if max_cost == min_cost:
-                scores[name] = 1.0
-            else:
-                normalized = (cost - min_cost) / (max_cost - min_cost)
-                scores[name] = 1.0 - normalized
-        return scores
+        min_cost = min(costs.values())
+        span = max(costs.values()) - min_cost
+        if span == 0:
+            return dict.fromkeys(costs, 1.0)
+        return {name: 1.0 - (cost - min_cost) / span for name, cost in costs.items()}
 
     def _select_custom(
         self,
@@ -285,7 +356,7 @@ class SmartFactory:
                 scores[name] = custom_scorer(service, metadata)
             except Exception as exc:
                 logger.error("Custom scorer failed for %s/%s: %s", service_type, name, exc)
-        return max(scores, key=scores.get) if scores else None
+        return _argmax(scores)
 
     async def _get_specific_service(
         self,
@@ -387,13 +458,14 @@ class SmartFactory:
         if not self._config.cache_instances:
             return None
 
-        cached = self._service_cache.get(service_type, {}).get(provider)
-        if not cached:
+        key = (service_type, provider)
+        cached = self._service_cache.get(key)
+        if cached is None:
             return None
 
         instance, cached_at = cached
         if self._config.cache_ttl > 0 and (time.time() - cached_at) > self._config.cache_ttl:
-            self._service_cache[service_type].pop(provider, None)
+            self._service_cache.pop(key, None)
             return None
         return instance
 
@@ -401,10 +473,7 @@ class SmartFactory:
         if not self._config.cache_instances:
             return
 
-        if service_type not in self._service_cache:
-            self._service_cache[service_type] = {}
-
-        self._service_cache[service_type][provider] = (service, time.time())
+        self._service_cache[(service_type, provider)] = (service, time.time())
 
     @classmethod
     def configure(cls, config: SmartFactoryConfig) -> None:
@@ -412,6 +481,10 @@ class SmartFactory:
 
     @classmethod
     def reset(cls) -> None:
-        if cls._instance:
-            cls._instance._service_cache.clear()
-        cls._instance = None
+        cls._instance._service_cache.clear()
+        cls._instance._healthy_cache.clear()
+        cls._instance._cost_score_cache.clear()
+        cls._instance = cls()
+
+
+SmartFactory._instance = SmartFactory()
@@ -74,9 +74,13 @@ RETRY_MODE_CLEAR_STAGES: dict[RetryMode, str | list[StageType]] = {
 }
 
 
+# 任务类型到处理流程的映射（未列出的类型走 AUDIO_STAGE_FLOW）
+SOURCE_TYPE_STAGE_FLOW: dict[str, list[StageType]] = {
+    "youtube": YOUTUBE_STAGE_FLOW,
+    "url": YOUTUBE_STAGE_FLOW,  # url 任务派发给 process_youtube worker
+}
+
+
 def get_stage_flow(source_type: str) -> list[StageType]:
     """根据任务类型获取处理流程"""
-    if source_type in {"youtube", "url"}:
-        return YOUTUBE_STAGE_FLOW
-    else:
-        return AUDIO_STAGE_FLOW
+    return SOURCE_TYPE_STAGE_FLOW.get(source_type, AUDIO_STAGE_FLOW)
@@ -24,10 +24,20 @@ engine: AsyncEngine = create_async_engine(
     pool_pre_ping=True,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    # LIFO：优先复用最近归还的热连接，低峰时多余连接自然闲置、可被 recycle 回收
+    pool_use_lifo=True,
 )
 async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
+# 只读路径：关闭 autoflush，查询前不再扫描 identity map 里的脏对象
+readonly_session_factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_factory() as session:
         yield session
+
+
+async def get_readonly_db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with readonly_session_factory() as session:
+        yield session
@@ -1,5 +1,9 @@
+import importlib
 import logging
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import lru_cache
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -24,25 +28,40 @@ from app.core.middleware import (
 from app.core.monitoring import MonitoringSystem
 from app.core.response import error, get_request_id, reset_request_id, set_request_id
 from app.core.smart_factory import SelectionStrategy, SmartFactory, SmartFactoryConfig
-from app.db import async_session_factory
+from app.db import async_session_factory, engine
 from app.i18n.codes import ErrorCode
-from app.services.asr import (
-    aliyun,  # noqa: F401
-    tencent,  # noqa: F401
-    volcengine,  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# 导入即触发 @register_service 装饰器 / 配置 schema 注册的服务模块。
+# 在 lifespan 启动阶段导入而非模块顶层：import app.main（测试、导出 OpenAPI 等）不再连带加载各家 SDK；
+# 启动阶段在开始接收请求前完成，服务仍先于第一个请求注册。
+_SERVICE_MODULES = (
+    "app.services.asr.configs",
+    "app.services.asr.aliyun",
+    "app.services.asr.tencent",
+    "app.services.asr.volcengine",
+    "app.services.feature.configs",
+    "app.services.llm.configs",
+    "app.services.llm.image_service",
+    "app.services.llm.proxy",
+    "app.services.storage.configs",
+    "app.services.storage.cos",
+    "app.services.storage.minio",
+    "app.services.storage.oss",
+    "app.services.storage.tos",
 )
-from app.services.asr import configs as asr_configs  # noqa: F401
-from app.services.feature import configs as feature_configs  # noqa: F401
 
-# 导入所有服务模块以触发 @register_service 装饰器
-# 必须在模块顶层导入，而不是在函数内部，这样装饰器才会正确执行
-from app.services.llm import configs as llm_configs  # noqa: F401
-from app.services.llm import image_service as _llm_image_service  # noqa: F401
-from app.services.llm import proxy as _llm_proxy  # noqa: F401
-from app.services.storage import configs as storage_configs  # noqa: F401
-from app.services.storage import cos, minio, oss, tos  # noqa: F401
 
-logger = logging.getLogger(__name__)
+def _register_services() -> None:
+    for module_name in _SERVICE_MODULES:
+        importlib.import_module(module_name)
+
+
+@lru_cache(maxsize=512)
+def _get_static_message(code: ErrorCode, locale: str) -> str:
+    """无插值参数的错误文案只取决于 (code, locale)，缓存后错误路径只剩一次元组哈希"""
+    return get_message(code, locale)
 
 
 def _http_status_error_code(status_code: int) -> ErrorCode:
@@ -103,21 +122,44 @@ async def business_error_handler(request: Request, exc: BusinessError) -> JSONRe
     return error(exc.code.value, message)
 
 
+# asyncpg 对非法 UUID 字面量的报错片段
+_DB_INVALID_UUID_MARKER = "invalid UUID"
+
+
 async def database_error_handler(request: Request, exc: DBAPIError) -> JSONResponse:
     locale = getattr(request.state, "locale", "zh")
     # 媒体字节流路径（get_media_user → _resolve_user 的 db.get/flush 可能抛 DBAPIError）
     # 同样需要真实 HTTP 状态码，否则 <audio> 收到 200+JSON 无法触发 error 事件刷票重试。
-    is_media = _is_media_stream_request(request)
-    if "invalid UUID" in str(exc):
-        # 无效的ID直接当作资源不存在处理，用户不需要知道ID格式问题
-        code = ErrorCode.TASK_NOT_FOUND
-        message = get_message(code, locale)
-        status_code = _media_http_status(code) if is_media else 200
-        return error(code.value, message, status_code=status_code)
-    code = ErrorCode.DATABASE_SERVICE_ERROR
-    message = get_message(code, locale)
-    status_code = _media_http_status(code) if is_media else 200
-    return error(code.value, message, status_code=status_code)
+    # 无效的ID直接当作资源不存在处理，用户不需要知道ID格式问题
+    code = ErrorCode.TASK_NOT_FOUND if _DB_INVALID_UUID_MARKER in str(exc) else ErrorCode.DATABASE_SERVICE_ERROR
+    status_code = _media_http_status(code) if _is_media_stream_request(request) else 200
+    return error(code.value, _get_static_message(code, locale), status_code=status_code)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """应用生命周期：yield 之前为启动（完成后才开始接收请求），之后为关闭。"""
+    configure_logging()
+    _register_services()
+    SmartFactory.configure(
+        SmartFactoryConfig(
+            default_strategy=SelectionStrategy.HEALTH_FIRST,
+            enable_monitoring=True,
+            enable_fault_tolerance=True,
+        )
+    )
+    MonitoringSystem.get_instance().start()
+    ConfigManager.configure_db(async_session_factory, cache_ttl_seconds=settings.CONFIG_CENTER_CACHE_TTL)
+    if settings.CONFIG_CENTER_DB_ENABLED:
+        await ConfigManager.refresh_from_db()
+    await litellm_health.start()
+
+    yield
+
+    await litellm_health.stop()
+    MonitoringSystem.get_instance().stop()
+    # 主动归还连接池里的连接，避免滚动发布时旧进程的空闲连接挤占 PG max_connections
+    await engine.dispose()
 
 
 def create_app() -> FastAPI:
@@ -128,6 +170,7 @@ def create_app() -> FastAPI:
         docs_url="/docs" if _enable_docs else None,
         redoc_url="/redoc" if _enable_docs else None,
         openapi_url="/openapi.json" if _enable_docs else None,
+        lifespan=lifespan,
     )
 
     # CORS configuration
@@ -170,28 +213,6 @@ def create_app() -> FastAPI:
         minimum_size=1024,
     )
 
-    @app.on_event("startup")
-    async def startup_event() -> None:
-        """Initialize services on application startup."""
-        configure_logging()
-        SmartFactory.configure(
-            SmartFactoryConfig(
-                default_strategy=SelectionStrategy.HEALTH_FIRST,
-                enable_monitoring=True,
-                enable_fault_tolerance=True,
-            )
-        )
-        MonitoringSystem.get_instance().start()
-        ConfigManager.configure_db(async_session_factory, cache_ttl_seconds=settings.CONFIG_CENTER_CACHE_TTL)
-        if settings.CONFIG_CENTER_DB_ENABLED:
-            await ConfigManager.refresh_from_db()
-        await litellm_health.start()
-
-    @app.on_event("shutdown")
-    async def shutdown_event() -> None:
-        await litellm_health.stop()
-        MonitoringSystem.get_instance().stop()
-
     app.add_exception_handler(BusinessError, business_error_handler)
 
     @app.exception_handler(HTTPException)
@@ -221,7 +242,7 @@ def create_app() -> FastAPI:
             )
 
             locale = getattr(request.state, "locale", "zh")
-            message = get_message(ErrorCode.INTERNAL_SERVER_ERROR, locale)
+            message = _get_static_message(ErrorCode.INTERNAL_SERVER_ERROR, locale)
             status_code = 500 if _is_media_stream_request(request) else 200
             return error(ErrorCode.INTERNAL_SERVER_ERROR.value, message, status_code=status_code)
         finally:
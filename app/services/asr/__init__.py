@@ -1,9 +1,31 @@
 from __future__ import annotations
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from app.services.asr import configs as _configs  # noqa: F401
-from app.services.asr.aliyun import AliyunASRService
 from app.services.asr.base import ASRService
-from app.services.asr.tencent import TencentASRService
-from app.services.asr.volcengine import VolcengineASRService
+
+if TYPE_CHECKING:
+    from app.services.asr.aliyun import AliyunASRService
+    from app.services.asr.tencent import TencentASRService
+    from app.services.asr.volcengine import VolcengineASRService
+
+# 各提供商实现按需导入（PEP 562）：只用到 base/configs 的调用方（如 TranscriptSegment）
+# 不再连带加载全部厂商 SDK。服务注册由 app.main / worker 显式导入提供商模块触发。
+_LAZY_EXPORTS = {
+    "TencentASRService": "app.services.asr.tencent",
+    "AliyunASRService": "app.services.asr.aliyun",
+    "VolcengineASRService": "app.services.asr.volcengine",
+}
 
 __all__ = ["ASRService", "TencentASRService", "AliyunASRService", "VolcengineASRService"]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
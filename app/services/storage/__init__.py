@@ -1,11 +1,25 @@
 from __future__ import annotations
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from app.services.storage import configs as _configs  # noqa: F401
 from app.services.storage.base import StorageService
-from app.services.storage.cos import COSStorageService
-from app.services.storage.minio import MinioStorageService
-from app.services.storage.oss import OSSStorageService
-from app.services.storage.tos import TOSStorageService
+
+if TYPE_CHECKING:
+    from app.services.storage.cos import COSStorageService
+    from app.services.storage.minio import MinioStorageService
+    from app.services.storage.oss import OSSStorageService
+    from app.services.storage.tos import TOSStorageService
+
+# 各提供商实现按需导入（PEP 562）：只用到 base/configs 的调用方不再连带加载全部厂商 SDK。
+# 服务注册由 app.main / worker 显式导入提供商模块触发。
+_LAZY_EXPORTS = {
+    "COSStorageService": "app.services.storage.cos",
+    "MinioStorageService": "app.services.storage.minio",
+    "OSSStorageService": "app.services.storage.oss",
+    "TOSStorageService": "app.services.storage.tos",
+}
 
 __all__ = [
     "StorageService",
@@ -14,3 +28,12 @@ __all__ = [
     "OSSStorageService",
     "TOSStorageService",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,38 @@
+"""get_redis_client:并发首次调用只创建一个客户端,之后复用同一实例。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app.core.redis as redis_module
+
+
+def test_concurrent_first_calls_create_single_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    created: list[object] = []
+    barrier = threading.Barrier(8)
+
+    class _FakeRedis:
+        @classmethod
+        def from_url(cls, url: str, **kwargs: object) -> object:
+            time.sleep(0.01)  # 放大竞态窗口
+            client = object()
+            created.append(client)
+            return client
+
+    monkeypatch.setattr(redis_module, "Redis", _FakeRedis)
+    monkeypatch.setattr(redis_module, "_redis_client", None)
+    monkeypatch.setattr(redis_module, "_get_redis_url", lambda: "redis://localhost:6379/0")
+
+    def _call() -> object:
+        barrier.wait()
+        return redis_module.get_redis_client()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = list(pool.map(lambda _: _call(), range(8)))
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
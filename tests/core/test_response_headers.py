@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 
-from app.core.response import error
+from app.core.response import error, reset_request_id, set_request_id
 
 
 def test_error_sets_custom_header_and_status() -> None:
@@ -20,3 +20,20 @@ def test_error_without_headers_unchanged() -> None:
     resp = error(40000, "bad param")
     assert resp.status_code == 200
     assert "retry-after" not in resp.headers
+
+
+def test_trace_id_falls_back_to_fresh_hex_outside_request() -> None:
+    first = json.loads(error(40000, "bad param").body)["traceId"]
+    second = json.loads(error(40000, "bad param").body)["traceId"]
+
+    assert len(first) == 32
+    int(first, 16)
+    assert first != second
+
+
+def test_trace_id_uses_request_context() -> None:
+    token = set_request_id("req-123")
+    try:
+        assert json.loads(error(40000, "bad param").body)["traceId"] == "req-123"
+    finally:
+        reset_request_id(token)
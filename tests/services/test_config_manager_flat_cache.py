@@ -0,0 +1,44 @@
+"""单元：ConfigManager 读路径快表 _configs_flat 与 _configs 保持同步。
+
+get_config 命中时走 {(service_type, name): config} 单层字典；写入（_cache_config）与
+清理（clear）必须同时维护两张表，否则 clear() 之后快表仍返回旧实例。
+"""
+
+from __future__ import annotations
+
+# 触发 storage schema 注册（COSConfig/OSSConfig/MinioConfig 等）
+import app.services.storage.configs  # noqa: F401
+from app.config import settings
+from app.core.config_manager import ConfigManager
+
+
+def _configure_minio(monkeypatch, endpoint: str) -> None:
+    monkeypatch.setattr(settings, "MINIO_ENDPOINT", endpoint, raising=False)
+    monkeypatch.setattr(settings, "MINIO_ACCESS_KEY", "ak", raising=False)
+    monkeypatch.setattr(settings, "MINIO_SECRET_KEY", "sk", raising=False)
+    monkeypatch.setattr(settings, "MINIO_BUCKET", "audio-assistant", raising=False)
+    monkeypatch.setattr(settings, "CONFIG_CENTER_DB_ENABLED", False, raising=False)
+
+
+def test_get_config_populates_flat_cache(monkeypatch) -> None:
+    ConfigManager.clear("storage")
+    _configure_minio(monkeypatch, "localhost:9000")
+
+    config = ConfigManager.get_config("storage", "minio")
+
+    assert ConfigManager._configs_flat[("storage", "minio")] is config
+    assert ConfigManager.get_config("storage", "minio") is config
+    ConfigManager.clear("storage")
+
+
+def test_clear_drops_flat_cache_entries(monkeypatch) -> None:
+    ConfigManager.clear("storage")
+    _configure_minio(monkeypatch, "localhost:9000")
+    ConfigManager.get_config("storage", "minio")
+
+    ConfigManager.clear("storage")
+    assert ("storage", "minio") not in ConfigManager._configs_flat
+
+    _configure_minio(monkeypatch, "minio.internal:9000")
+    assert ConfigManager.get_config("storage", "minio").endpoint == "minio.internal:9000"
+    ConfigManager.clear("storage")
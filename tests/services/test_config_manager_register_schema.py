@@ -0,0 +1,81 @@
+"""单元：ConfigManager.register_schema 与 is_schema_registered 负缓存的交互。
+
+同名重复注册以后者为准（与模块重复导入/热替换的既有语义一致）；注册与负缓存写入互斥，
+刚注册的 schema 不能被并发的未命中查询记成缺失。
+"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app.core.config_manager import ConfigManager, ServiceConfig
+
+
+class _DummyConfig(ServiceConfig):
+    token: str = "t"
+
+
+class _OtherDummyConfig(ServiceConfig):
+    token: str = "o"
+
+
+@pytest.fixture
+def _cleanup_schema():
+    yield
+    ConfigManager._schemas["feature"].pop("__test_dummy__", None)
+    ConfigManager._missing_schemas.discard(("feature", "__test_dummy__"))
+
+
+@pytest.mark.usefixtures("_cleanup_schema")
+def test_register_same_class_twice_is_idempotent() -> None:
+    ConfigManager.register_schema("feature", "__test_dummy__", _DummyConfig)
+    ConfigManager.register_schema("feature", "__test_dummy__", _DummyConfig)
+
+    assert ConfigManager._schemas["feature"]["__test_dummy__"] is _DummyConfig
+
+
+@pytest.mark.usefixtures("_cleanup_schema")
+def test_register_different_class_replaces_previous() -> None:
+    ConfigManager.register_schema("feature", "__test_dummy__", _DummyConfig)
+    ConfigManager.register_schema("feature", "__test_dummy__", _OtherDummyConfig)
+
+    assert ConfigManager._schemas["feature"]["__test_dummy__"] is _OtherDummyConfig
+
+
+@pytest.mark.usefixtures("_cleanup_schema")
+def test_register_clears_negative_cache() -> None:
+    """先探测未注册（写入负缓存），注册后必须立即可见。"""
+    assert ConfigManager.is_schema_registered("feature", "__test_dummy__") is False
+    assert ("feature", "__test_dummy__") in ConfigManager._missing_schemas
+
+    ConfigManager.register_schema("feature", "__test_dummy__", _DummyConfig)
+
+    assert ConfigManager.is_schema_registered("feature", "__test_dummy__") is True
+
+
+class _RegisterOnFirstAcquire:
+    """替身锁：第一次加锁前注册 schema，模拟「读方未命中 → 注册方注册 → 读方写负缓存」的交错。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.pending = True
+
+    def __enter__(self) -> None:
+        if self.pending:
+            self.pending = False
+            ConfigManager.register_schema("feature", "__test_dummy__", _DummyConfig)
+        self._lock.acquire()
+
+    def __exit__(self, *exc: object) -> None:
+        self._lock.release()
+
+
+@pytest.mark.usefixtures("_cleanup_schema")
+def test_concurrent_register_not_cached_as_missing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ConfigManager, "_lock", _RegisterOnFirstAcquire())
+
+    assert ConfigManager.is_schema_registered("feature", "__test_dummy__") is True
+    assert ("feature", "__test_dummy__") not in ConfigManager._missing_schemas
+    assert ConfigManager.is_schema_registered("feature", "__test_dummy__") is True
@@ -7,7 +7,7 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+import time
 
 import httpx
 import pytest
@@ -48,7 +48,7 @@ async def test_stream_fast_fails_when_circuit_open(monkeypatch: pytest.MonkeyPat
     breaker = svc._circuit_breaker
     # 强制 OPEN 且刚失败（elapsed < timeout，不进入 HALF_OPEN 探测）。
     breaker.state = CircuitState.OPEN
-    breaker.last_failure_time = datetime.now()
+    breaker.last_failure_time = time.monotonic()
     try:
         with pytest.raises(BusinessError) as ei:
             async for _ in svc._stream_api({"model": "m", "messages": []}):
@@ -0,0 +1,59 @@
+"""单元：asr / storage 包按需导入提供商实现（PEP 562 __getattr__）。
+
+import 包本身（或其 base/configs）不应连带加载各厂商 SDK；访问导出名时才导入对应模块。
+在子进程中检查，避免被本进程里其它测试已导入的模块干扰。
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+_PROBE = """
+import sys
+import {package}
+assert not [m for m in {modules!r} if m in sys.modules], "provider imported eagerly"
+cls = {package}.{export}
+assert cls.__module__ == {module!r}
+assert {package}.{export} is cls
+"""
+
+
+@pytest.mark.parametrize(
+    ("package", "export", "module", "modules"),
+    [
+        (
+            "app.services.storage",
+            "MinioStorageService",
+            "app.services.storage.minio",
+            (
+                "app.services.storage.cos",
+                "app.services.storage.minio",
+                "app.services.storage.oss",
+                "app.services.storage.tos",
+            ),
+        ),
+        (
+            "app.services.asr",
+            "TencentASRService",
+            "app.services.asr.tencent",
+            ("app.services.asr.aliyun", "app.services.asr.tencent", "app.services.asr.volcengine"),
+        ),
+    ],
+)
+def test_provider_exports_are_lazy(package: str, export: str, module: str, modules: tuple[str, ...]) -> None:
+    code = _PROBE.format(package=package, export=export, module=module, modules=modules)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=_REPO_ROOT)
+    assert out.returncode == 0, out.stderr
+
+
+def test_unknown_attribute_raises() -> None:
+    import app.services.storage as storage
+
+    with pytest.raises(AttributeError):
+        _ = storage.NoSuchService
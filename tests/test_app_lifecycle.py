@@ -0,0 +1,60 @@
+"""应用生命周期（lifespan）：启动先于请求完成，关闭时停止后台组件并释放数据库连接池。"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+import app.main as main_module
+
+
+@pytest.mark.asyncio
+async def test_lifespan_starts_and_disposes_engine(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    async def _start_litellm() -> None:
+        calls.append("litellm.start")
+
+    async def _stop_litellm() -> None:
+        calls.append("litellm.stop")
+
+    async def _dispose() -> None:
+        calls.append("dispose")
+
+    monitoring = SimpleNamespace(
+        start=lambda: calls.append("monitoring.start"),
+        stop=lambda: calls.append("monitoring.stop"),
+    )
+
+    # lifespan 会改写进程级单例与 root logger：全部替换为记录调用，避免泄漏到后续测试
+    monkeypatch.setattr(main_module, "configure_logging", lambda: calls.append("configure_logging"))
+    monkeypatch.setattr(main_module, "_register_services", lambda: calls.append("register"))
+    monkeypatch.setattr(main_module.SmartFactory, "configure", lambda config: calls.append("smart_factory.configure"))
+    monkeypatch.setattr(main_module, "MonitoringSystem", SimpleNamespace(get_instance=lambda: monitoring))
+    monkeypatch.setattr(
+        main_module.ConfigManager,
+        "configure_db",
+        lambda session_factory, cache_ttl_seconds: calls.append("config.configure_db"),
+    )
+    monkeypatch.setattr(main_module.litellm_health, "start", _start_litellm)
+    monkeypatch.setattr(main_module.litellm_health, "stop", _stop_litellm)
+    monkeypatch.setattr(main_module, "engine", SimpleNamespace(dispose=_dispose))
+    monkeypatch.setattr(main_module.settings, "CONFIG_CENTER_DB_ENABLED", False, raising=False)
+
+    app = main_module.create_app()
+    assert not app.router.on_startup
+    assert not app.router.on_shutdown
+
+    startup = [
+        "configure_logging",
+        "register",
+        "smart_factory.configure",
+        "monitoring.start",
+        "config.configure_db",
+        "litellm.start",
+    ]
+    async with app.router.lifespan_context(app):
+        assert calls == startup
+
+    assert calls == [*startup, "litellm.stop", "monitoring.stop", "dispose"]
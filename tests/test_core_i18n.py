@@ -0,0 +1,36 @@
+from app.core import i18n
+from app.core.i18n import get_message
+from app.i18n.codes import ErrorCode
+
+
+def test_locales_loaded_at_import_with_int_keys() -> None:
+    assert set(i18n._CACHE) == {"zh", "en"}
+    assert all(isinstance(key, int) for key in i18n._CACHE["zh"])
+
+
+def test_unknown_locale_falls_back_to_zh_without_caching() -> None:
+    assert get_message(ErrorCode.INTERNAL_SERVER_ERROR, "fr-FR") == get_message(ErrorCode.INTERNAL_SERVER_ERROR, "zh")
+    assert "fr-FR" not in i18n._CACHE
+
+
+def test_kwargs_ignored_for_template_without_placeholders() -> None:
+    plain = get_message(ErrorCode.INTERNAL_SERVER_ERROR, "zh")
+    assert "{" not in plain
+    assert get_message(ErrorCode.INTERNAL_SERVER_ERROR, "zh", detail="x") == plain
+
+
+def test_compiled_template_matches_format_map() -> None:
+    code = next(code for code, tpl in i18n._CACHE["zh"].items() if tpl.count("{") >= 2)
+    template = i18n._CACHE["zh"][code]
+    kwargs = {name: f"<{name}>" for _, name, _, _ in i18n._FORMATTER.parse(template) if name}
+
+    assert i18n._COMPILED["zh"][code] is not None
+    assert get_message(ErrorCode(code), "zh", **kwargs) == template.format_map(kwargs)
+    # 缺少参数时与 format_map 一致：安全返回模板本体
+    assert get_message(ErrorCode(code), "zh", unrelated="x") == template
+
+
+def test_compile_template_rejects_format_specs() -> None:
+    assert i18n._compile_template("{value:.2f}") is None
+    assert i18n._compile_template("{user.name}") is None
+    assert i18n._compile_template("共 {count} 条")({"count": "3"}) == "共 3 条"
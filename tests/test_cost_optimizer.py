@@ -2,7 +2,13 @@ from datetime import date
 
 import pytest
 
-from app.core.cost_optimizer import CostOptimizer, CostOptimizerConfig, CostStrategy, CostTracker
+from app.core.cost_optimizer import (
+    CostOptimizer,
+    CostOptimizerConfig,
+    CostStrategy,
+    CostTracker,
+    ServiceCostInfo,
+)
 from app.core.registry import ServiceMetadata
 
 
@@ -130,3 +136,87 @@ def test_cost_tracking() -> None:
 
     breakdown = tracker.get_service_breakdown()
     assert breakdown["llm"]["doubao"] == pytest.approx(0.03)
+
+
+def _info(name: str, cost: float, perf: float) -> ServiceCostInfo:
+    return ServiceCostInfo(
+        service_name=name,
+        estimated_cost=cost,
+        performance_score=perf,
+        combined_score=cost,
+        metadata=ServiceMetadata(name=name, service_type="llm"),
+    )
+
+
+def test_cost_ceiling_picks_best_performance_within_ceiling() -> None:
+    optimizer = CostOptimizer(
+        CostOptimizerConfig(
+            strategy=CostStrategy.COST_CEILING,
+            cost_ceiling_ratio=1.5,
+            enable_cost_tracking=False,
+        )
+    )
+    infos = [_info("cheap", 1.0, 5.0), _info("mid", 1.4, 8.0), _info("pricey", 2.0, 50.0)]
+
+    assert optimizer._apply_strategy(infos).service_name == "mid"
+
+
+def test_budget_constrained_reads_daily_cost_once() -> None:
+    optimizer = CostOptimizer(
+        CostOptimizerConfig(
+            strategy=CostStrategy.BUDGET_CONSTRAINED,
+            daily_budget=2.0,
+            enable_redis_persistence=False,
+        )
+    )
+    calls: list[date] = []
+
+    def fake_daily_cost(target_date: date) -> float:
+        calls.append(target_date)
+        return 1.0
+
+    optimizer.tracker.get_daily_cost = fake_daily_cost
+    infos = [_info("a", 0.5, 1.0), _info("b", 0.8, 9.0), _info("c", 1.5, 20.0)]
+
+    assert optimizer._apply_strategy(infos).service_name == "b"
+    assert len(calls) == 1
+
+
+def test_memory_tracker_evicts_oldest_beyond_max_records() -> None:
+    tracker = CostTracker(use_redis=False, max_records=2)
+    for cost in (0.01, 0.02, 0.03):
+        tracker.record_usage("llm", "doubao", {"input_tokens": 100}, cost)
+
+    today = date.today()
+    summary = tracker.get_daily_summary(today, today)
+    assert summary[today]["llm:doubao"] == pytest.approx(0.05)
+    assert len(tracker._by_date[today]) == 2
+
+
+def test_memory_reserve_usage_rejects_over_budget() -> None:
+    tracker = CostTracker(use_redis=False)
+
+    assert tracker.reserve_usage("llm", "doubao", {}, 0.6, daily_budget=1.0) is True
+    assert tracker.reserve_usage("llm", "doubao", {}, 0.6, daily_budget=1.0) is False
+    assert tracker.get_daily_cost(date.today()) == pytest.approx(0.6)
+
+
+class _EchoService:
+    def estimate_cost(self, *args: float) -> tuple[float, ...]:
+        return args
+
+
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        ({"input_tokens": 10}, (10, 0)),
+        ({"output_tokens": 5, "duration_seconds": 60}, (0, 5)),
+        ({"duration_seconds": 60, "duration_hours": 1}, (60,)),
+        ({"duration_hours": 0.5, "requests": 3}, (1800,)),
+        ({"requests": 3}, (0.0, 3)),
+        ({"unrelated": 1}, 0.0),
+        ({}, 0.0),
+    ],
+)
+def test_estimate_cost_dispatch_keeps_param_precedence(params: dict, expected: object) -> None:
+    assert CostOptimizer(CostOptimizerConfig())._estimate_cost(_EchoService(), params) == expected
@@ -0,0 +1,362 @@
+"""CostTracker 的 Redis 访问模式：写入/读取都应批量走 pipeline，而不是逐条往返。"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import app.core.cost_optimizer as cost_optimizer_module
+from app.core.cost_optimizer import CostTracker
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._calls: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def __getattr__(self, name: str):
+        def _queue(*args: Any, **kwargs: Any) -> _FakePipeline:
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return _queue
+
+    def execute(self) -> list[Any]:
+        self._redis.round_trips += 1
+        return [getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+
+class _FakeRedis:
+    """最小化的同步 Redis 替身（decode_responses=True 语义）。"""
+
+    def __init__(self) -> None:
+        self.zsets: dict[str, dict[str, float]] = defaultdict(dict)
+        self.hashes: dict[str, dict[str, str]] = defaultdict(dict)
+        self.ttls: dict[str, int] = {}
+        self.strings: dict[str, str] = {}
+        self.commands: list[str] = []
+        self.round_trips = 0
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+    def zadd(self, key: str, mapping: dict[str, float]) -> int:
+        self.commands.append("zadd")
+        self.zsets[key].update(mapping)
+        return len(mapping)
+
+    def hincrbyfloat(self, key: str, field: str, amount: float) -> float:
+        self.commands.append("hincrbyfloat")
+        value = float(self.hashes[key].get(field, 0.0)) + amount
+        self.hashes[key][field] = repr(value)
+        return value
+
+    def expire(self, key: str, seconds: int) -> bool:
+        self.commands.append("expire")
+        self.ttls[key] = seconds
+        return True
+
+    def zrangebyscore(self, key: str, min_score: float, max_score: float) -> list[str]:
+        self.commands.append("zrangebyscore")
+        members = self.zsets.get(key, {})
+        return [m for m, score in sorted(members.items(), key=lambda kv: kv[1]) if min_score <= score <= max_score]
+
+    def zremrangebyscore(self, key: str, min_score: Any, max_score: float) -> int:
+        self.commands.append("zremrangebyscore")
+        stale = [m for m, score in self.zsets.get(key, {}).items() if score <= max_score]
+        for member in stale:
+            del self.zsets[key][member]
+        return len(stale)
+
+    def get(self, key: str) -> str | None:
+        self.commands.append("get")
+        return self.strings.get(key)
+
+    def set(self, key: str, value: Any, nx: bool = False) -> bool:
+        self.commands.append("set")
+        if nx and key in self.strings:
+            return False
+        self.strings[key] = str(value)
+        return True
+
+    def scan_iter(self, match: str = "*", count: int = 100):
+        self.commands.append("scan")
+        keys = [*self.zsets, *self.hashes, *self.strings]
+        return iter([key for key in keys if fnmatch.fnmatchcase(key, match)])
+
+    def hgetall(self, key: str) -> dict[str, str]:
+        self.commands.append("hgetall")
+        return dict(self.hashes.get(key, {}))
+
+    def hvals(self, key: str) -> list[str]:
+        self.commands.append("hvals")
+        return list(self.hashes.get(key, {}).values())
+
+    def register_script(self, script: str):
+        """按 _BUDGET_RESERVE_LUA 的语义模拟 EVALSHA（一次往返）。"""
+
+        def _call(keys: list[str], args: list[Any]) -> list[Any]:
+            self.round_trips += 1
+            self.commands.append("evalsha")
+            cost, budget, field, ttl = float(args[0]), float(args[1]), args[2], int(args[3])
+            current = sum(float(v) for v in self.hashes.get(keys[0], {}).values())
+            if current + cost > budget:
+                return [0, repr(current)]
+            value = float(self.hashes[keys[0]].get(field, 0.0)) + cost
+            self.hashes[keys[0]][field] = repr(value)
+            self.ttls[keys[0]] = ttl
+            return [1, repr(current + cost)]
+
+        return _call
+
+
+@pytest.fixture
+def tracker() -> tuple[CostTracker, _FakeRedis]:
+    fake = _FakeRedis()
+    tracker = CostTracker(use_redis=False)
+    tracker._use_redis = True
+    tracker._redis_client = fake
+    tracker._budget_reserve_script = fake.register_script("")
+    return tracker, fake
+
+
+def test_record_usage_writes_in_single_round_trip(tracker) -> None:
+    tracker, fake = tracker
+
+    tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.01)
+
+    assert fake.round_trips == 1
+    assert sorted(fake.commands) == ["expire", "expire", "hincrbyfloat", "set", "zadd", "zadd", "zremrangebyscore"]
+    assert set(fake.ttls) == {"cost:records:llm:doubao", next(iter(fake.hashes))}
+
+
+def test_record_usage_skips_recent_expire(tracker) -> None:
+    tracker, fake = tracker
+
+    tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.01)
+    fake.commands.clear()
+    tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.02)
+
+    assert fake.round_trips == 2
+    assert sorted(fake.commands) == ["hincrbyfloat", "zadd", "zadd"]
+
+
+def _seed(fake: _FakeRedis) -> None:
+    fake.hashes["cost:daily:2026-03-01"] = {"llm:doubao": "1.5", "asr:tencent": "0.5"}
+    fake.hashes["cost:daily:2026-03-03"] = {"llm:doubao": "2.0"}
+
+
+def test_daily_summary_reads_range_in_single_round_trip(tracker) -> None:
+    tracker, fake = tracker
+    _seed(fake)
+
+    summary = tracker.get_daily_summary(date(2026, 3, 1), date(2026, 3, 3))
+
+    assert fake.round_trips == 1
+    assert fake.commands.count("hgetall") == 3
+    assert summary == {
+        date(2026, 3, 1): {"llm:doubao": 1.5, "asr:tencent": 0.5},
+        date(2026, 3, 3): {"llm:doubao": 2.0},
+    }
+
+
+def test_service_breakdown_reads_range_in_single_round_trip(tracker) -> None:
+    tracker, fake = tracker
+    _seed(fake)
+
+    breakdown = tracker.get_service_breakdown(date(2026, 3, 1), date(2026, 3, 3))
+
+    assert fake.round_trips == 1
+    assert breakdown == {"llm": {"doubao": 3.5}, "asr": {"tencent": 0.5}}
+
+
+def test_monthly_cost_reads_month_in_single_round_trip(tracker) -> None:
+    tracker, fake = tracker
+    _seed(fake)
+
+    assert tracker.get_monthly_cost(2026, 3) == pytest.approx(4.0)
+    assert fake.round_trips == 1
+    assert fake.commands.count("hvals") == 31
+
+
+def test_records_in_range_uses_global_index(tracker) -> None:
+    tracker, fake = tracker
+    now = datetime.now()
+    # 索引早于查询区间就已上线：不需要回退 SCAN
+    fake.strings["cost:records:_all:since"] = str((now - timedelta(hours=1)).timestamp())
+    tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.01)
+    tracker.record_usage("llm", "qwen", {"input_tokens": 100}, 0.02)
+    tracker.record_usage("asr", "tencent", {"duration_seconds": 60}, 0.03)
+    fake.commands.clear()
+    fake.round_trips = 0
+
+    window = (now - timedelta(minutes=1), now + timedelta(minutes=1))
+    all_records = tracker.get_records_in_range(*window)
+    llm_records = tracker.get_records_in_range(*window, service_type="llm")
+
+    assert sorted(r.service_name for r in all_records) == ["doubao", "qwen", "tencent"]
+    assert sorted(r.service_name for r in llm_records) == ["doubao", "qwen"]
+    # 每次查询：索引（since + member）一次往返，记录一次往返
+    assert fake.round_trips == 4
+    assert "scan" not in fake.commands
+
+
+def test_daily_cost_cached_and_kept_warm_by_writes(tracker) -> None:
+    tracker, fake = tracker
+    today = date.today()
+    fake.hashes[f"cost:daily:{today.isoformat()}"] = {"llm:doubao": "1.0"}
+
+    assert tracker.get_daily_cost(today) == pytest.approx(1.0)
+    tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.5)
+    fake.commands.clear()
+
+    assert tracker.get_daily_cost(today) == pytest.approx(1.5)
+    assert "hvals" not in fake.commands
+
+
+def test_reserve_usage_checks_and_records_atomically(tracker) -> None:
+    tracker, fake = tracker
+    today = date.today()
+    daily_key = f"cost:daily:{today.isoformat()}"
+    fake.hashes[daily_key] = {"llm:doubao": "0.9"}
+
+    assert tracker.reserve_usage("llm", "doubao", {"input_tokens": 100}, 0.05, daily_budget=1.0) is True
+    assert fake.commands.count("hincrbyfloat") == 0
+    assert float(fake.hashes[daily_key]["llm:doubao"]) == pytest.approx(0.95)
+
+    fake.commands.clear()
+    assert tracker.reserve_usage("llm", "doubao", {"input_tokens": 100}, 0.1, daily_budget=1.0) is False
+    assert fake.commands == ["evalsha"]
+    assert tracker.get_daily_cost(today) == pytest.approx(0.95)
+    assert "hvals" not in fake.commands
+
+
+def test_redis_write_does_not_hold_lock_during_round_trip(tracker, monkeypatch) -> None:
+    tracker, fake = tracker
+    lock_held: list[bool] = []
+    original_execute = _FakePipeline.execute
+
+    def _execute(self: _FakePipeline) -> list[Any]:
+        lock_held.append(tracker._lock.locked())
+        return original_execute(self)
+
+    monkeypatch.setattr(_FakePipeline, "execute", _execute)
+    tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.01)
+
+    assert lock_held == [False]
+
+
+def test_generate_report_reads_range_in_single_round_trip(tracker) -> None:
+    tracker, fake = tracker
+    _seed(fake)
+
+    report = tracker.generate_report(date(2026, 3, 1), date(2026, 3, 3))
+
+    assert fake.round_trips == 1
+    assert fake.commands.count("hgetall") == 3
+    assert "hvals" not in fake.commands
+    assert report.total_cost == pytest.approx(4.0)
+    assert report.daily_costs == {
+        date(2026, 3, 1): pytest.approx(2.0),
+        date(2026, 3, 2): 0.0,
+        date(2026, 3, 3): pytest.approx(2.0),
+    }
+    assert report.service_breakdown == {"llm": {"doubao": 3.5}, "asr": {"tencent": 0.5}}
+
+
+def test_local_writes_do_not_extend_daily_cache_ttl(tracker, monkeypatch) -> None:
+    """本进程持续写入不能让当日总额缓存永不过期：TTL 到期后必须回源，看到其他 worker 的花费。"""
+    tracker, fake = tracker
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(
+        cost_optimizer_module,
+        "time",
+        SimpleNamespace(monotonic=lambda: clock["now"], time=cost_optimizer_module.time.time),
+    )
+    today = date.today()
+    daily_key = f"cost:daily:{today.isoformat()}"
+    fake.hashes[daily_key] = {"llm:doubao": "1.0"}
+
+    assert tracker.get_daily_cost(today) == pytest.approx(1.0)
+    for step in range(1, 4):
+        clock["now"] = 1000.0 + 0.4 * step
+        tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.1)
+
+    # 其他 worker 在 Redis 中记下的花费
+    fake.hashes[daily_key]["asr:tencent"] = "5.0"
+
+    assert tracker.get_daily_cost(today) == pytest.approx(6.3)
+
+
+def _seed_legacy_record(fake: _FakeRedis, ts: datetime) -> None:
+    """索引上线前写入的记录：只在 cost:records:{field} 中，不在全局索引里。"""
+    raw = json.dumps(
+        {
+            "timestamp": ts.isoformat(),
+            "service_type": "asr",
+            "service_name": "tencent",
+            "request_params": {},
+            "estimated_cost": 0.2,
+            "actual_cost": None,
+        }
+    )
+    fake.zsets["cost:records:asr:tencent"][raw] = ts.timestamp()
+
+
+def test_records_in_range_includes_pre_index_records(tracker) -> None:
+    tracker, fake = tracker
+    now = datetime.now()
+    _seed_legacy_record(fake, now - timedelta(days=2))
+    tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.01)
+
+    records = tracker.get_records_in_range(now - timedelta(days=3), now + timedelta(minutes=1))
+
+    assert sorted(r.service_name for r in records) == ["doubao", "tencent"]
+    assert "scan" in fake.commands
+    assert float(fake.strings["cost:records:_all:since"]) >= (now - timedelta(seconds=5)).timestamp()
+
+
+def test_records_in_range_stops_scanning_after_retention(tracker) -> None:
+    """索引上线超过保留期后，旧记录都已过期，区间再早也只读索引。"""
+    tracker, fake = tracker
+    now = datetime.now()
+    fake.strings["cost:records:_all:since"] = str((now - timedelta(days=91)).timestamp())
+    tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.01)
+    fake.commands.clear()
+
+    records = tracker.get_records_in_range(now - timedelta(days=365), now + timedelta(minutes=1))
+
+    assert [r.service_name for r in records] == ["doubao"]
+    assert "scan" not in fake.commands
+
+
+def test_records_in_range_uses_index_again_once_marker_ages_past_retention(tracker, monkeypatch) -> None:
+    """兜底判断每次都要重新读时钟：同一区间在索引上线满保留期后应回到索引路径。"""
+    tracker, fake = tracker
+    now = datetime.now()
+    clock = {"now": now.timestamp()}
+    monkeypatch.setattr(
+        cost_optimizer_module,
+        "time",
+        SimpleNamespace(monotonic=cost_optimizer_module.time.monotonic, time=lambda: clock["now"]),
+    )
+    fake.strings["cost:records:_all:since"] = str((now - timedelta(days=89)).timestamp())
+    tracker.record_usage("llm", "doubao", {"input_tokens": 100}, 0.01)
+    start, end = now - timedelta(days=365), now + timedelta(minutes=1)
+
+    fake.commands.clear()
+    tracker.get_records_in_range(start, end)
+    assert "scan" in fake.commands
+
+    clock["now"] += timedelta(days=2).total_seconds()
+    fake.commands.clear()
+    records = tracker.get_records_in_range(start, end)
+
+    assert [r.service_name for r in records] == ["doubao"]
+    assert "scan" not in fake.commands
@@ -0,0 +1,199 @@
+"""容错装饰器（retry / fallback 等）的行为测试。"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import fault_tolerance
+from app.core.fault_tolerance import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitBreakerOpenError,
+    CircuitState,
+    RetryConfig,
+    fallback,
+    resilient,
+    retry,
+)
+
+
+def test_retry_uses_capped_exponential_delays(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr(fault_tolerance, "time", SimpleNamespace(sleep=sleeps.append))
+    calls = {"count": 0}
+
+    @retry(RetryConfig(max_attempts=5, initial_delay=1.0, max_delay=5.0, exponential_base=2.0, jitter=False))
+    def flaky() -> str:
+        calls["count"] += 1
+        if calls["count"] < 5:
+            raise RuntimeError("boom")
+        return "ok"
+
+    assert flaky() == "ok"
+    assert sleeps == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_retry_computes_backoff_schedule_once_per_decoration(monkeypatch: pytest.MonkeyPatch) -> None:
+    schedules: list[RetryConfig] = []
+    original = fault_tolerance._backoff_delays
+
+    def counting(config: RetryConfig) -> tuple[float, ...]:
+        schedules.append(config)
+        return original(config)
+
+    monkeypatch.setattr(fault_tolerance, "_backoff_delays", counting)
+    monkeypatch.setattr(fault_tolerance, "time", SimpleNamespace(sleep=lambda delay: None))
+
+    @retry(RetryConfig(max_attempts=4, jitter=False))
+    def always_fails() -> None:
+        raise RuntimeError("boom")
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            always_fails()
+    assert len(schedules) == 1
+
+
+def test_retry_jitter_uses_module_level_random(monkeypatch: pytest.MonkeyPatch) -> None:
+    # 抖动与 sleep 都经由模块级导入，替换模块属性即可生效（函数体内 import 会绕过这里的替换）
+    sleeps: list[float] = []
+    monkeypatch.setattr(fault_tolerance, "time", SimpleNamespace(sleep=sleeps.append))
+    monkeypatch.setattr(fault_tolerance, "random", SimpleNamespace(random=lambda: 0.0))
+
+    @retry(RetryConfig(max_attempts=2, initial_delay=2.0, jitter=True))
+    def always_fails() -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        always_fails()
+    assert sleeps == [1.0]
+
+
+async def test_async_retry_raises_after_max_attempts(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr(fault_tolerance.asyncio, "sleep", fake_sleep)
+
+    @retry(RetryConfig(max_attempts=3, initial_delay=0.5, jitter=True), exceptions=(ValueError,))
+    async def always_fails() -> None:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await always_fails()
+    assert len(sleeps) == 2
+    assert 0.25 <= sleeps[0] <= 0.5
+    assert 0.5 <= sleeps[1] <= 1.0
+
+
+@pytest.mark.parametrize("use_async_fallback", [True, False])
+async def test_fallback_dispatches_sync_and_async_handlers(use_async_fallback: bool) -> None:
+    async def async_handler(x: int) -> str:
+        return f"async:{x}"
+
+    def sync_handler(x: int) -> str:
+        return f"sync:{x}"
+
+    handler = async_handler if use_async_fallback else sync_handler
+
+    @fallback(fallback_func=handler)
+    async def broken(x: int) -> str:
+        raise RuntimeError("boom")
+
+    expected = "async:1" if use_async_fallback else "sync:1"
+    assert await broken(1) == expected
+
+
+async def test_fallback_without_strategy_reraises() -> None:
+    @fallback()
+    async def broken() -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await broken()
+
+
+async def test_circuit_breaker_opens_and_recovers_on_monotonic_clock(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(fault_tolerance, "time", SimpleNamespace(monotonic=lambda: clock["now"]))
+    breaker = CircuitBreaker.get_or_create(
+        "__test_breaker__", CircuitBreakerConfig(failure_threshold=2, success_threshold=1, timeout=10.0)
+    )
+    outcome = {"fail": True}
+
+    @breaker.protected
+    async def call() -> str:
+        if outcome["fail"]:
+            raise RuntimeError("boom")
+        return "ok"
+
+    try:
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await call()
+        assert breaker.state == CircuitState.OPEN
+
+        clock["now"] += 5.0
+        with pytest.raises(CircuitBreakerOpenError):
+            await call()
+
+        clock["now"] += 5.0
+        outcome["fail"] = False
+        assert await call() == "ok"
+        assert breaker.state == CircuitState.CLOSED
+    finally:
+        CircuitBreaker._breakers.pop("__test_breaker__", None)
+
+
+def test_get_or_create_registers_once() -> None:
+    try:
+        breaker = CircuitBreaker.get_or_create("__test_registry__")
+
+        assert CircuitBreaker.get_or_create("__test_registry__") is breaker
+        assert CircuitBreaker._breakers["__test_registry__"] is breaker
+        # 直接构造的实例不进入全局注册表，不会覆盖已注册的同名熔断器
+        CircuitBreaker("__test_registry__")
+        assert CircuitBreaker._breakers["__test_registry__"] is breaker
+    finally:
+        CircuitBreaker._breakers.pop("__test_registry__", None)
+
+
+async def test_resilient_fuses_retry_and_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    monkeypatch.setattr(fault_tolerance, "asyncio", SimpleNamespace(sleep=fake_sleep))
+    calls = {"count": 0}
+
+    async def always_fails(x: int) -> str:
+        calls["count"] += 1
+        raise RuntimeError("boom")
+
+    wrapped = resilient(
+        retry_config=RetryConfig(max_attempts=3, initial_delay=1.0, jitter=False),
+        fallback_func=lambda x: f"degraded:{x}",
+    )(always_fails)
+
+    # 单层包装：直接包住原函数，而不是 fallback(retry(func)) 两层
+    assert wrapped.__wrapped__ is always_fails
+    assert await wrapped(7) == "degraded:7"
+    assert calls["count"] == 3
+    assert sleeps == [1.0, 2.0]
+
+
+def test_retry_configs_are_frozen_and_share_delay_schedule() -> None:
+    config = RetryConfig(max_attempts=3, initial_delay=0.5, max_delay=5.0)
+
+    with pytest.raises(AttributeError):
+        config.max_attempts = 5  # type: ignore[misc]
+    with pytest.raises(AttributeError):
+        CircuitBreakerConfig().timeout = 1.0  # type: ignore[misc]
+    assert fault_tolerance._backoff_delays(config) is fault_tolerance._backoff_delays(
+        RetryConfig(max_attempts=3, initial_delay=0.5, max_delay=5.0)
+    )
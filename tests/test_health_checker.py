@@ -0,0 +1,169 @@
+"""HealthChecker 的锁分片、缓存与状态机行为。"""
+
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import health_checker
+from app.core.health_checker import HealthChecker, HealthStatus
+
+
+class _FakeService:
+    def __init__(self, healthy: bool = True) -> None:
+        self.healthy = healthy
+        self.calls = 0
+
+    async def health_check(self) -> bool:
+        self.calls += 1
+        return self.healthy
+
+
+@pytest.fixture(autouse=True)
+def _clean_results():
+    HealthChecker.clear()
+    yield
+    HealthChecker.clear()
+
+
+@pytest.fixture
+def fake_services(monkeypatch: pytest.MonkeyPatch) -> dict[tuple[str, str], _FakeService]:
+    services: dict[tuple[str, str], _FakeService] = {}
+
+    def fake_get(service_type: str, name: str) -> _FakeService:
+        return services[(service_type, name)]
+
+    monkeypatch.setattr("app.core.health_checker.ServiceRegistry.get", fake_get)
+    return services
+
+
+def test_locks_are_sharded_by_service_type() -> None:
+    # 持有 llm 分片锁时，asr 的读取不应被阻塞（单一全局 Lock 会在这里死锁）
+    with HealthChecker._locks["llm"]:
+        assert HealthChecker.is_healthy("asr", "tencent") is True
+        assert HealthChecker.get_healthy_services("storage") == []
+
+
+def test_all_locks_blocks_lazy_creation_of_new_type(monkeypatch: pytest.MonkeyPatch) -> None:
+    # 持有全部分片锁期间，新类型的分片锁不能被懒创建并获取，否则「全部分片」快照对新类型不独占
+    locks = {service_type: lock for service_type, lock in HealthChecker._locks.items() if service_type != "video"}
+    monkeypatch.setattr(HealthChecker, "_locks", locks)
+    acquired = threading.Event()
+
+    def use_new_type() -> None:
+        with HealthChecker._type_lock("video"):
+            acquired.set()
+
+    worker = threading.Thread(target=use_new_type)
+    with HealthChecker._all_locks():
+        worker.start()
+        assert not acquired.wait(timeout=0.2)
+    worker.join(timeout=1)
+
+    assert acquired.is_set()
+
+
+async def test_check_service_caches_result(fake_services) -> None:
+    service = fake_services[("llm", "doubao")] = _FakeService()
+
+    first = await HealthChecker.check_service("llm", "doubao")
+    second = await HealthChecker.check_service("llm", "doubao")
+
+    assert first is second
+    assert first.status == HealthStatus.HEALTHY
+    assert service.calls == 1
+    assert HealthChecker.get_healthy_services("llm") == ["doubao"]
+
+
+async def test_cache_expires_on_monotonic_clock(fake_services, monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = {"now": 500.0}
+    monkeypatch.setattr(health_checker, "time", SimpleNamespace(monotonic=lambda: clock["now"]))
+    service = fake_services[("asr", "tencent")] = _FakeService()
+
+    await HealthChecker.check_service("asr", "tencent")
+    clock["now"] += HealthChecker.cache_duration - 1
+    await HealthChecker.check_service("asr", "tencent")
+    assert service.calls == 1
+
+    clock["now"] += 2
+    result = await HealthChecker.check_service("asr", "tencent")
+    assert service.calls == 2
+    assert result.last_check_monotonic == clock["now"]
+    assert result.to_dict()["last_check_time"] is not None
+
+
+async def test_get_all_results_returns_read_only_live_views(fake_services) -> None:
+    fake_services[("llm", "doubao")] = _FakeService()
+    await HealthChecker.check_service("llm", "doubao")
+
+    results = HealthChecker.get_all_results()
+
+    assert results["llm"]["doubao"].status == HealthStatus.HEALTHY
+    with pytest.raises(TypeError):
+        results["llm"]["qwen"] = results["llm"]["doubao"]  # type: ignore[index]
+
+
+async def test_check_all_only_probes_registered_types(fake_services, monkeypatch: pytest.MonkeyPatch) -> None:
+    fake_services[("asr", "tencent")] = _FakeService()
+    monkeypatch.setattr("app.core.health_checker.ServiceRegistry.registered_types", lambda: ["asr"])
+    monkeypatch.setattr("app.core.health_checker.ServiceRegistry.list_services", lambda service_type: ["tencent"])
+
+    results = await HealthChecker.check_all()
+
+    assert results["asr"]["tencent"].status == HealthStatus.HEALTHY
+    assert not results.get("llm")
+
+
+def test_unknown_service_type_does_not_raise() -> None:
+    assert HealthChecker.is_healthy("video", "x") is True
+    assert HealthChecker.get_status("video", "x") is None
+    assert HealthChecker.get_healthy_services("video") == []
+
+
+async def test_check_all_commits_all_results_in_one_pass(fake_services, monkeypatch: pytest.MonkeyPatch) -> None:
+    fake_services[("llm", "doubao")] = _FakeService()
+    fake_services[("llm", "qwen")] = _FakeService(healthy=False)
+    monkeypatch.setattr("app.core.health_checker.ServiceRegistry.registered_types", lambda: ["llm"])
+    monkeypatch.setattr(
+        "app.core.health_checker.ServiceRegistry.list_services", lambda service_type: ["doubao", "qwen"]
+    )
+    acquisitions: list[str] = []
+    original_all_locks = HealthChecker._all_locks.__func__
+
+    def counting_all_locks(cls):
+        acquisitions.append("all")
+        return original_all_locks(cls)
+
+    monkeypatch.setattr(HealthChecker, "_all_locks", classmethod(counting_all_locks))
+
+    results = await HealthChecker.check_all()
+
+    assert acquisitions == ["all", "all", "all"]  # 开始 + 写回 + get_all_results 快照
+    assert results["llm"]["doubao"].status == HealthStatus.HEALTHY
+    assert results["llm"]["qwen"].consecutive_failures == 1
+    assert results["llm"]["qwen"].total_checks == 1
+
+    # 缓存期内再次 check_all 不再探测
+    await HealthChecker.check_all()
+    assert fake_services[("llm", "doubao")].calls == 1
+
+
+async def test_healthy_snapshot_published_on_state_change(fake_services, monkeypatch: pytest.MonkeyPatch) -> None:
+    service = fake_services[("llm", "doubao")] = _FakeService()
+    assert HealthChecker.healthy_snapshot("llm") == ()
+
+    await HealthChecker.check_service("llm", "doubao")
+    snapshot = HealthChecker.healthy_snapshot("llm")
+    assert snapshot == ("doubao",)
+
+    # 持有分片锁时读者仍可无锁读取快照
+    with HealthChecker._locks["llm"]:
+        assert HealthChecker.get_healthy_services("llm") == ["doubao"]
+
+    service.healthy = False
+    monkeypatch.setattr(HealthChecker, "failure_threshold", 1)
+    await HealthChecker.check_service("llm", "doubao", force=True)
+    assert HealthChecker.healthy_snapshot("llm") == ()
+    assert snapshot == ("doubao",)  # 旧快照不可变，不受后续发布影响
@@ -1,7 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from app.core.load_balancer import (
     BalancingStrategy,
+    ConnectionTracker,
     LeastConnectionsBalancer,
     LoadBalancerConfig,
     LoadBalancerFactory,
@@ -77,3 +80,93 @@ def test_health_filter(monkeypatch: pytest.MonkeyPatch) -> None:
     balancer = LoadBalancerFactory.create(BalancingStrategy.ROUND_ROBIN)
     for _ in range(5):
         assert balancer.select("llm") == "doubao"
+
+
+def test_round_robin_is_consistent_across_threads() -> None:
+    balancer = RoundRobinBalancer(LoadBalancerConfig())
+    services = ["doubao", "qwen", "deepseek"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        picks = list(pool.map(lambda _: balancer.select_service("llm", services), range(300)))
+
+    assert {name: picks.count(name) for name in services} == {"doubao": 100, "qwen": 100, "deepseek": 100}
+
+
+def test_weighted_round_robin_interleaves_and_rebuilds_on_membership_change(monkeypatch: pytest.MonkeyPatch) -> None:
+    balancer = WeightedRoundRobinBalancer(LoadBalancerConfig())
+    priorities = {"doubao": 10, "qwen": 20, "deepseek": 100}
+
+    def fake_metadata(service_type: str, name: str) -> ServiceMetadata:
+        return ServiceMetadata(name=name, service_type=service_type, priority=priorities[name])
+
+    monkeypatch.setattr("app.core.load_balancer.ServiceRegistry.get_metadata", fake_metadata)
+
+    # 权重 10:5 约分为 2:1，交错排布而不是连续选中同一服务
+    picks = [balancer.select_service("llm", ["doubao", "qwen"]) for _ in range(6)]
+    assert picks == ["doubao", "qwen", "doubao"] * 2
+
+    # 成员变化时重建调度表：10:5:1 → 每轮 16 次
+    picks = [balancer.select_service("llm", ["doubao", "qwen", "deepseek"]) for _ in range(16)]
+    assert picks.count("doubao") == 10
+    assert picks.count("qwen") == 5
+    assert picks.count("deepseek") == 1
+
+
+def test_weighted_round_robin_caches_weights_until_registry_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    balancer = WeightedRoundRobinBalancer(LoadBalancerConfig())
+    lookups: list[str] = []
+    version = [1]
+
+    def fake_metadata(service_type: str, name: str) -> ServiceMetadata:
+        lookups.append(name)
+        return ServiceMetadata(name=name, service_type=service_type, priority=10)
+
+    monkeypatch.setattr("app.core.load_balancer.ServiceRegistry.get_metadata", fake_metadata)
+    monkeypatch.setattr("app.core.load_balancer.ServiceRegistry.version", lambda: version[0])
+
+    # 健康抖动导致成员变化会重建调度表，但权重直接命中缓存
+    balancer.select_service("llm", ["doubao", "qwen"])
+    balancer.select_service("llm", ["doubao"])
+    balancer.select_service("llm", ["doubao", "qwen"])
+    assert lookups == ["doubao", "qwen"]
+
+    version[0] = 2
+    balancer.select_service("llm", ["doubao", "qwen"])
+    assert lookups == ["doubao", "qwen", "doubao", "qwen"]
+
+
+def test_connection_tracker_counts_per_service() -> None:
+    tracker = ConnectionTracker()
+    tracker.increment("llm", "doubao")
+    tracker.increment("llm", "doubao")
+    tracker.increment("llm", "qwen")
+    tracker.increment("asr", "tencent")
+    tracker.decrement("llm", "qwen")
+    tracker.decrement("llm", "qwen")
+    tracker.decrement("llm", "unknown")
+
+    assert tracker.get_count("llm", "doubao") == 2
+    assert tracker.get_count("llm", "qwen") == 0
+    assert tracker.get_all_counts("llm") == {"doubao": 2, "qwen": 0}
+    assert tracker.get_all_counts("asr") == {"tencent": 1}
+
+
+def test_least_connections_picks_among_ties_only() -> None:
+    balancer = LeastConnectionsBalancer(LoadBalancerConfig())
+    services = ["doubao", "qwen", "deepseek"]
+    balancer.tracker.increment("llm", "doubao")
+
+    picks = {balancer.select_service("llm", services) for _ in range(50)}
+
+    assert picks <= {"qwen", "deepseek"}
+
+
+def test_factory_returns_one_instance_per_strategy_across_threads(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(LoadBalancerFactory, "_instances", {})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        balancers = list(pool.map(lambda _: LoadBalancerFactory.create(BalancingStrategy.RANDOM), range(32)))
+
+    assert isinstance(balancers[0], RandomBalancer)
+    assert all(balancer is balancers[0] for balancer in balancers)
+    assert LoadBalancerFactory.create(BalancingStrategy.LEAST_CONNECTIONS) is not balancers[0]
@@ -0,0 +1,47 @@
+"""LocaleMiddleware:按 Accept-Language 首个标签解析 zh/en,其余回退 zh;解析结果按头值缓存。"""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from httpx import ASGITransport
+
+from app.core.middleware import LocaleMiddleware, _parse_locale
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("zh-CN,zh;q=0.9,en;q=0.8", "zh"),
+        ("en-US,en;q=0.9", "en"),
+        (" EN-gb ", "en"),
+        ("fr-FR,en;q=0.5", "zh"),
+        ("", "zh"),
+    ],
+)
+def test_parse_locale(header: str, expected: str) -> None:
+    assert _parse_locale(header) == expected
+
+
+def test_parse_locale_is_cached() -> None:
+    _parse_locale.cache_clear()
+    _parse_locale("en-US,en;q=0.9")
+    _parse_locale("en-US,en;q=0.9")
+    assert _parse_locale.cache_info().hits == 1
+
+
+async def test_middleware_sets_request_locale() -> None:
+    app = FastAPI()
+
+    @app.get("/locale")
+    async def locale(request: Request) -> dict[str, str]:
+        return {"locale": request.state.locale}
+
+    app.add_middleware(LocaleMiddleware)
+    async with httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        english = await client.get("/locale", headers={"Accept-Language": "en-US"})
+        default = await client.get("/locale")
+
+    assert english.json() == {"locale": "en"}
+    assert default.json() == {"locale": "zh"}
@@ -0,0 +1,51 @@
+"""LoggingMiddleware:INFO 开启时记录访问日志;级别高于 INFO 时直接透传,不计时也不记录。"""
+
+from __future__ import annotations
+
+import logging
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+from app.core.middleware import LoggingMiddleware
+
+
+def _make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"ok": "1"}
+
+    app.add_middleware(LoggingMiddleware)
+    return app
+
+
+async def _get_ping() -> httpx.Response:
+    async with httpx.AsyncClient(transport=ASGITransport(app=_make_app()), base_url="http://test") as client:
+        return await client.get("/ping")
+
+
+async def test_logs_request_when_info_enabled(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(logging.INFO, logger="app.middleware"):
+        resp = await _get_ping()
+
+    assert resp.status_code == 200
+    assert any("request GET /ping status=200" in rec.getMessage() for rec in caplog.records)
+
+
+async def test_skips_logging_when_info_disabled(caplog: pytest.LogCaptureFixture, monkeypatch) -> None:
+    import app.core.middleware as middleware
+
+    def _no_clock() -> int:
+        raise AssertionError("级别高于 INFO 时不应计时")
+
+    monkeypatch.setattr(middleware, "time", SimpleNamespace(monotonic_ns=_no_clock))
+    with caplog.at_level(logging.WARNING, logger="app.middleware"):
+        resp = await _get_ping()
+
+    assert resp.status_code == 200
+    assert not [rec for rec in caplog.records if rec.name == "app.middleware"]
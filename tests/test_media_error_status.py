@@ -21,8 +21,9 @@ from httpx import ASGITransport
 from sqlalchemy.exc import DBAPIError
 
 from app.core.exceptions import BusinessError
+from app.core.i18n import get_message
 from app.i18n.codes import ErrorCode
-from app.main import _media_http_status, business_error_handler, database_error_handler
+from app.main import _get_static_message, _media_http_status, business_error_handler, database_error_handler
 
 
 def _build_app() -> FastAPI:
@@ -168,3 +169,11 @@ async def test_non_media_db_error_keeps_envelope_200() -> None:
         resp = await client.get("/api/v1/tasks/dberror")
     assert resp.status_code == 200
     assert resp.json()["code"] == int(ErrorCode.DATABASE_SERVICE_ERROR)
+
+
+@pytest.mark.parametrize("locale", ["zh", "en", "xx"])
+def test_static_message_cache_matches_get_message(locale: str) -> None:
+    """DB/500 handlers use the (code, locale) message cache; output must equal get_message."""
+    code = ErrorCode.DATABASE_SERVICE_ERROR
+    assert _get_static_message(code, locale) == get_message(code, locale)
+    assert _get_static_message(code, locale) is _get_static_message(code, locale)
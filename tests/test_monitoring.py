@@ -1,11 +1,16 @@
 import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
 import pytest
 
+from app.config import settings
 from app.core.monitoring import (
     MetricsCollector,
     MonitoringConfig,
     MonitoringSystem,
+    ServiceMetrics,
     monitor,
 )
 
@@ -76,3 +81,79 @@ async def test_monitor_decorator() -> None:
     metrics = monitoring.collector.get_metrics("test", "service")
     assert metrics is not None
     assert metrics.total_calls == 1
+
+
+def test_response_time_stats_track_sliding_window() -> None:
+    """均值/最大值/分位数随窗口淘汰逐次更新，且与整窗排序的结果一致。"""
+    metrics = ServiceMetrics(service_type="llm", service_name="doubao", response_times=deque(maxlen=50))
+    durations = [((i * 37) % 101) / 10 for i in range(160)]
+
+    for index, duration in enumerate(durations, start=1):
+        metrics.update_response_time(duration)
+        ordered = sorted(durations[max(0, index - 50) : index])
+        assert metrics.avg_response_time == pytest.approx(sum(ordered) / len(ordered))
+        assert metrics.max_response_time == ordered[-1]
+        if len(ordered) >= 20:
+            assert metrics.p95_response_time == ordered[int(len(ordered) * 0.95)]
+            assert metrics.p99_response_time == ordered[int(len(ordered) * 0.99)]
+
+
+def test_collector_shards_metrics_across_services() -> None:
+    collector = MetricsCollector(MonitoringConfig(enable_percentiles=False))
+    names = [f"svc{i}" for i in range(40)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda name: collector.record_call("llm", name, success=True, duration=0.1), names * 25))
+
+    all_metrics = collector.get_all_metrics()
+    assert sorted(all_metrics) == sorted(f"llm:{name}" for name in names)
+    assert all(metrics.total_calls == 25 for metrics in all_metrics.values())
+    assert len({id(lock) for lock, bucket in collector._shards if bucket}) > 1
+
+    collector.reset_metrics("llm", "svc0")
+    assert collector.get_metrics("llm", "svc0") is None
+    assert len(collector.get_all_metrics()) == 39
+
+
+def test_monitor_returns_original_function_when_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "MONITORING_ENABLED", False)
+
+    async def handler() -> str:
+        return "ok"
+
+    assert monitor("test", "disabled")(handler) is handler
+
+
+def test_record_call_stamps_last_update_as_timestamp() -> None:
+    collector = MetricsCollector(MonitoringConfig(enable_percentiles=False))
+    before = datetime.now()
+    collector.record_call("llm", "doubao", success=True, duration=0.1)
+
+    metrics = collector.get_metrics("llm", "doubao")
+    assert metrics is not None
+    assert isinstance(metrics.last_update, float)
+    assert before - timedelta(seconds=1) <= metrics.last_update_at <= datetime.now()
+    assert metrics.window_start <= metrics.last_update
+
+
+def test_monitor_binds_singleton_on_first_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    MonitoringSystem._instance = None
+    system = MonitoringSystem.get_instance(MonitoringConfig())
+    lookups: list[None] = []
+    original = MonitoringSystem.get_instance.__func__
+
+    def _counting_get_instance(cls, config=None):
+        lookups.append(None)
+        return original(cls, config)
+
+    monkeypatch.setattr(MonitoringSystem, "get_instance", classmethod(_counting_get_instance))
+
+    @monitor("test", "bound")
+    def handler() -> str:
+        return "ok"
+
+    assert [handler() for _ in range(3)] == ["ok"] * 3
+    assert len(lookups) == 1
+    metrics = system.collector.get_metrics("test", "bound")
+    assert metrics is not None
+    assert metrics.total_calls == 3
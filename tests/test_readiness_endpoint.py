@@ -15,7 +15,7 @@ import pytest
 from fastapi import FastAPI
 from httpx import ASGITransport
 
-from app.api.deps import get_db
+from app.api.deps import get_readonly_db
 from app.api.v1 import health as health_module
 
 
@@ -36,7 +36,7 @@ def _make_app(session: Any) -> FastAPI:
     async def _db() -> AsyncIterator[Any]:
         yield session
 
-    app.dependency_overrides[get_db] = _db
+    app.dependency_overrides[get_readonly_db] = _db
     return app
 
 
@@ -0,0 +1,197 @@
+"""ServiceRegistry.get:单例命中走免锁快路径;model_id/config 总是新建实例。"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app.core.registry as registry_module
+from app.core.registry import ServiceRegistry
+
+
+class _CountingService:
+    created = 0
+
+    def __init__(self, model_id: str | None = None) -> None:
+        type(self).created += 1
+        self.model_id = model_id
+
+
+class _LockGuard:
+    """替身锁：记录进入次数，用于断言命中路径不加锁。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.acquired = 0
+
+    def __enter__(self) -> None:
+        self.acquired += 1
+        self._lock.acquire()
+
+    def __exit__(self, *exc: object) -> None:
+        self._lock.release()
+
+
+@pytest.fixture
+def counting_service(monkeypatch: pytest.MonkeyPatch) -> Iterator[_LockGuard]:
+    _CountingService.created = 0
+    guard = _LockGuard()
+    monkeypatch.setattr(ServiceRegistry, "_lock", guard)
+    monkeypatch.setitem(ServiceRegistry._services, "llm", dict(ServiceRegistry._services["llm"]))
+    ServiceRegistry.register("llm", "__counting__", _CountingService)
+    yield guard
+    ServiceRegistry._names_cache.clear()
+
+
+def test_cached_instance_is_returned_without_lock(counting_service: _LockGuard) -> None:
+    first = ServiceRegistry.get("llm", "__counting__")
+    acquired_after_create = counting_service.acquired
+
+    assert ServiceRegistry.get("llm", "__counting__") is first
+    assert counting_service.acquired == acquired_after_create
+    assert _CountingService.created == 1
+
+
+def test_concurrent_first_gets_create_single_instance(counting_service: _LockGuard) -> None:
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        instances = list(pool.map(lambda _: ServiceRegistry.get("llm", "__counting__"), range(32)))
+
+    assert _CountingService.created == 1
+    assert all(instance is instances[0] for instance in instances)
+
+
+def test_model_id_always_creates_new_instance(counting_service: _LockGuard) -> None:
+    cached = ServiceRegistry.get("llm", "__counting__")
+    custom = ServiceRegistry.get("llm", "__counting__", model_id="gpt-4o")
+
+    assert custom is not cached
+    assert custom.model_id == "gpt-4o"
+    assert ServiceRegistry.get("llm", "__counting__") is cached
+
+
+def test_unknown_service_raises(counting_service: _LockGuard) -> None:
+    with pytest.raises(ValueError, match="not registered"):
+        ServiceRegistry.get("llm", "__missing__")
+    with pytest.raises(ValueError, match="Unsupported service_type"):
+        ServiceRegistry.get("video", "__counting__")
+
+
+class _ConfigOnlyService:
+    def __init__(self, config: object | None = None) -> None:
+        self.config = config
+
+
+def test_injects_only_accepted_init_params(counting_service: _LockGuard, monkeypatch: pytest.MonkeyPatch) -> None:
+    ServiceRegistry.register("llm", "__config_only__", _ConfigOnlyService)
+    signature_calls: list[type] = []
+    original_signature = registry_module.inspect.signature
+
+    def _counting_signature(obj: object) -> object:
+        signature_calls.append(obj)
+        return original_signature(obj)
+
+    registry_module._injectable_params.cache_clear()
+    monkeypatch.setattr(registry_module.inspect, "signature", _counting_signature)
+
+    for _ in range(3):
+        service = ServiceRegistry.get("llm", "__config_only__", model_id="m", config="cfg", user_id="u")
+        assert service.config == "cfg"
+
+    assert len(signature_calls) == 1
+
+
+def test_service_names_cached_until_register(counting_service: _LockGuard) -> None:
+    names = ServiceRegistry.service_names("llm")
+
+    assert "__counting__" in names
+    assert ServiceRegistry.service_names("llm") is names
+    assert ServiceRegistry.list_services("llm") == list(names)
+
+    ServiceRegistry.register("llm", "__config_only__", _ConfigOnlyService)
+    assert ServiceRegistry.service_names("llm") == (*names, "__config_only__")
+
+
+def test_cache_fill_updates_entry_in_place(counting_service: _LockGuard) -> None:
+    entry = ServiceRegistry._services["llm"]["__counting__"]
+
+    instance = ServiceRegistry.get("llm", "__counting__")
+
+    assert ServiceRegistry._services["llm"]["__counting__"] is entry
+    assert entry.instance is instance
+    assert ServiceRegistry.get_metadata("llm", "__counting__") is entry.metadata
+
+
+def test_lookup_misses_keep_distinct_errors(counting_service: _LockGuard) -> None:
+    assert ServiceRegistry.is_registered("llm", "__counting__") is True
+    assert ServiceRegistry.is_registered("llm", "__missing__") is False
+    assert ServiceRegistry.is_registered("__nope__", "__counting__") is False
+
+    with pytest.raises(ValueError, match="Unsupported service_type"):
+        ServiceRegistry.get_metadata("__nope__", "__counting__")
+    with pytest.raises(ValueError, match="not registered for type 'llm'"):
+        ServiceRegistry.get_metadata("llm", "__missing__")
+
+
+class _BrokenService:
+    def __init__(self) -> None:
+        raise OSError("boom")
+
+
+def test_instantiation_failure_logs_without_traceback(
+    counting_service: _LockGuard, caplog: pytest.LogCaptureFixture
+) -> None:
+    ServiceRegistry.register("llm", "__broken__", _BrokenService)
+
+    with caplog.at_level(logging.ERROR, logger=registry_module.logger.name):
+        with pytest.raises(RuntimeError) as exc_info:
+            ServiceRegistry.get("llm", "__broken__")
+
+    assert isinstance(exc_info.value.__cause__, OSError)
+    (record,) = [r for r in caplog.records if r.levelno >= logging.ERROR]
+    assert record.getMessage() == "Failed to instantiate llm service '__broken__': boom"
+    assert record.exc_info is None
+
+
+def test_register_publishes_new_bucket(counting_service: _LockGuard) -> None:
+    """写时复制：读方持有的旧桶不受后续注册影响，可免锁遍历。"""
+    bucket = ServiceRegistry._services["llm"]
+
+    ServiceRegistry.register("llm", "__config_only__", _ConfigOnlyService)
+
+    assert "__config_only__" not in bucket
+    assert ServiceRegistry._services["llm"] is not bucket
+    assert ServiceRegistry._services["llm"]["__counting__"] is bucket["__counting__"]
+    assert ServiceRegistry.is_registered("llm", "__config_only__")
+
+
+class _ReplacementService:
+    def __init__(self) -> None:
+        pass
+
+
+class _ReregisterOnFirstAcquire(_LockGuard):
+    """替身锁：第一次加锁前重新注册 __counting__，模拟快路径未命中与拿锁之间的并发 register。"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pending = True
+
+    def __enter__(self) -> None:
+        if self.pending:
+            self.pending = False
+            ServiceRegistry.register("llm", "__counting__", _ReplacementService)
+        super().__enter__()
+
+
+def test_slow_path_reads_currently_published_bucket(counting_service: _LockGuard, monkeypatch) -> None:
+    monkeypatch.setattr(ServiceRegistry, "_lock", _ReregisterOnFirstAcquire())
+
+    instance = ServiceRegistry.get("llm", "__counting__")
+
+    assert isinstance(instance, _ReplacementService)
+    assert ServiceRegistry._services["llm"]["__counting__"].instance is instance
+    assert _CountingService.created == 0
@@ -0,0 +1,43 @@
+"""RequestIDMiddleware:透传入站 X-Request-Id,缺失时生成 32 位 hex 追踪 ID。"""
+
+from __future__ import annotations
+
+import httpx
+from fastapi import FastAPI, Request
+from httpx import ASGITransport
+
+from app.core.middleware import RequestIDMiddleware
+
+
+def _make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping(request: Request) -> dict[str, str]:
+        return {"trace_id": request.state.trace_id}
+
+    app.add_middleware(RequestIDMiddleware)
+    return app
+
+
+def _client(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+async def test_passes_through_incoming_request_id() -> None:
+    async with _client(_make_app()) as client:
+        resp = await client.get("/ping", headers={"X-Request-Id": " trace-abc "})
+    assert resp.headers["X-Request-Id"] == "trace-abc"
+    assert resp.json() == {"trace_id": "trace-abc"}
+
+
+async def test_generates_hex_request_id_when_missing() -> None:
+    async with _client(_make_app()) as client:
+        first = await client.get("/ping")
+        second = await client.get("/ping")
+
+    trace_id = first.headers["X-Request-Id"]
+    assert len(trace_id) == 32
+    int(trace_id, 16)
+    assert first.json() == {"trace_id": trace_id}
+    assert second.headers["X-Request-Id"] != trace_id
@@ -0,0 +1,27 @@
+"""服务提供商模块在 startup 注册，而非 import app.main 时。
+
+钉住：_register_services 导入全部提供商模块后，各类型的服务均已注册到 ServiceRegistry。
+"""
+
+from __future__ import annotations
+
+import pytest
+
+import app.main as main_module
+from app.core.registry import ServiceRegistry
+
+
+def test_register_services_imports_every_provider_module(monkeypatch: pytest.MonkeyPatch) -> None:
+    imported: list[str] = []
+    real_import = main_module.importlib.import_module
+
+    def _tracking_import(name: str):
+        imported.append(name)
+        return real_import(name)
+
+    monkeypatch.setattr(main_module.importlib, "import_module", _tracking_import)
+    main_module._register_services()
+
+    assert imported == list(main_module._SERVICE_MODULES)
+    for service_type in ("asr", "llm", "storage"):
+        assert ServiceRegistry.service_names(service_type)
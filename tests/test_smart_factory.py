@@ -1,7 +1,7 @@
 import pytest
 
 from app.core.registry import ServiceMetadata
-from app.core.smart_factory import SelectionStrategy, SmartFactory, SmartFactoryConfig
+from app.core.smart_factory import SelectionStrategy, SmartFactory, SmartFactoryConfig, _argmax
 
 
 class _FakeService:
@@ -274,3 +274,91 @@ async def test_no_healthy_services_fallback(monkeypatch: pytest.MonkeyPatch) ->
 
     service = await SmartFactory.get_service("llm", model_id="test-model")
     assert service.name == "fallback"
+
+
+@pytest.mark.asyncio
+async def test_candidate_services_cached_until_health_snapshot_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    _configure_factory()
+    listings: list[str] = []
+    snapshot = [("doubao",)]
+
+    def fake_list_services(service_type: str) -> list[str]:
+        listings.append(service_type)
+        return ["doubao"]
+
+    monkeypatch.setattr("app.core.smart_factory.ServiceRegistry.list_services", fake_list_services)
+    monkeypatch.setattr(
+        "app.core.smart_factory.HealthChecker.get_healthy_services",
+        lambda service_type: list(snapshot[0]),
+    )
+    monkeypatch.setattr(
+        "app.core.smart_factory.HealthChecker.healthy_snapshot",
+        lambda service_type: snapshot[0],
+    )
+    monkeypatch.setattr(
+        "app.core.smart_factory.ServiceRegistry.get",
+        lambda service_type, name, **kwargs: _FakeService(name),
+    )
+    monkeypatch.setattr(
+        "app.core.smart_factory.ServiceRegistry.get_metadata",
+        lambda service_type, name: ServiceMetadata(name=name, service_type=service_type, priority=10),
+    )
+
+    for _ in range(3):
+        service = await SmartFactory.get_service("llm", model_id="test-model")
+        assert service.name == "doubao"
+    assert listings == ["llm"]
+
+    # 健康状态变化会整体替换快照元组，缓存随之失效
+    snapshot[0] = tuple(["doubao"])
+    await SmartFactory.get_service("llm", model_id="test-model")
+    assert listings == ["llm", "llm"]
+
+
+def test_instance_is_created_eagerly_and_replaced_by_reset() -> None:
+    _configure_factory()
+    configured = SmartFactory.get_instance()
+    assert configured._config.enable_monitoring is False
+
+    SmartFactory.reset()
+    fresh = SmartFactory.get_instance()
+    assert fresh is not configured
+    assert fresh._config == SmartFactoryConfig()
+    assert SmartFactory.get_instance() is fresh
+
+
+def test_cost_scores_memoized_per_request_params(monkeypatch: pytest.MonkeyPatch) -> None:
+    _configure_factory()
+    factory = SmartFactory.get_instance()
+    estimates: list[str] = []
+    costs = {"cheap": 1.0, "pricey": 3.0}
+
+    def fake_estimate(self, service_type: str, name: str, request_params: dict) -> float:
+        estimates.append(name)
+        return costs[name] * request_params.get("input_tokens", 1)
+
+    monkeypatch.setattr("app.core.smart_factory.CostOptimizer.estimate_request_cost", fake_estimate)
+
+    first = factory._calculate_cost_scores("llm", ["cheap", "pricey"], {"input_tokens": 10})
+    second = factory._calculate_cost_scores("llm", ["cheap", "pricey"], {"input_tokens": 10})
+    assert first == second == {"cheap": 1.0, "pricey": 0.0}
+    assert estimates == ["cheap", "pricey"]
+
+    factory._calculate_cost_scores("llm", ["cheap", "pricey"], {"input_tokens": 20})
+    # 不可哈希的参数值不进缓存，照常计算
+    factory._calculate_cost_scores("llm", ["cheap", "pricey"], {"input_tokens": 10, "extra": {"a": 1}})
+    assert len(estimates) == 6
+
+
+@pytest.mark.parametrize(
+    "scores",
+    [
+        {},
+        {"only": -float("inf")},
+        {"a": 0.2, "b": 0.9, "c": 0.9},
+        {"a": -1.0, "b": -3.0},
+    ],
+)
+def test_argmax_matches_builtin_max(scores: dict[str, float]) -> None:
+    expected = max(scores, key=scores.get) if scores else None
+    assert _argmax(scores) == expected
@@ -29,3 +29,9 @@ def test_get_stage_flow_upload_returns_audio_flow() -> None:
 def test_get_stage_flow_unknown_falls_back_to_audio_flow() -> None:
     """未知 source_type 回退到 AUDIO_STAGE_FLOW，不应抛出。"""
     assert get_stage_flow("unknown_type") == AUDIO_STAGE_FLOW
+
+
+def test_get_stage_flow_returns_shared_module_lists() -> None:
+    """返回模块级常量本身（不复制），调用方不得原地修改。"""
+    assert get_stage_flow("youtube") is YOUTUBE_STAGE_FLOW
+    assert get_stage_flow("upload") is AUDIO_STAGE_FLOW